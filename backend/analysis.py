@@ -0,0 +1,200 @@
+"""
+Blood report analysis rules
+Extracts known parameters from report text and flags them against normal ranges
+"""
+
+import re
+
+from rule_engine import rule_set
+
+# Bump whenever patterns, units or ranges change so cached results are invalidated;
+# edits to the disease-pattern rules file change the digest part automatically
+RULES_VERSION = f"2-{rule_set.digest[:16]}"
+
+RISK_LEVELS = ("Low", "Medium", "High")
+
+
+# Analyze blood report text
+def analyze_blood_report(text):
+    """
+    Extract blood test values and provide basic analysis
+    """
+    blood_values = []
+    key_findings = []
+    recommendations = []
+    risk_level = "Low"
+    
+    # Common blood test patterns - improved for better extraction
+    patterns = {
+        'hemoglobin': r'(?:hemoglobin|hgb|hb)[\s:]*(\d+\.?\d*)',
+        'wbc': r'(?:white blood cell|wbc|leucocyte|leukocyte)[\s:]*(\d+\.?\d*)',
+        'rbc': r'(?:red blood cell|rbc|erythrocyte)[\s:]*(\d+\.?\d*)',
+        'platelet': r'(?:platelet|plt)[\s:]*(\d+\.?\d*)',
+        'hematocrit': r'(?:hematocrit|hct)[\s:]*(\d+\.?\d*)',
+        'mcv': r'(?:mcv|mean corpuscular volume)[\s:]*(\d+\.?\d*)',
+        'mch': r'(?:mch|mean corpuscular hemoglobin)[\s:]*(\d+\.?\d*)',
+        'mchc': r'(?:mchc|mean corpuscular hemoglobin concentration)[\s:]*(\d+\.?\d*)',
+        'glucose': r'(?:glucose|sugar|blood sugar)[\s:]*(\d+\.?\d*)',
+        'cholesterol': r'(?:cholesterol|chol|total cholesterol)[\s:]*(\d+\.?\d*)',
+        'hdl': r'(?:hdl|high density lipoprotein)[\s:]*(\d+\.?\d*)',
+        'ldl': r'(?:ldl|low density lipoprotein)[\s:]*(\d+\.?\d*)',
+        'triglycerides': r'(?:triglyceride|trig|triglycerides)[\s:]*(\d+\.?\d*)',
+        'creatinine': r'(?:creatinine|crea)[\s:]*(\d+\.?\d*)',
+        'urea': r'(?:urea|bun|blood urea nitrogen)[\s:]*(\d+\.?\d*)',
+        'bilirubin': r'(?:bilirubin|bili|total bilirubin)[\s:]*(\d+\.?\d*)',
+        'alt': r'(?:alt|alanine aminotransferase|sgpt)[\s:]*(\d+\.?\d*)',
+        'ast': r'(?:ast|aspartate aminotransferase|sgot)[\s:]*(\d+\.?\d*)',
+        'albumin': r'(?:albumin|alb)[\s:]*(\d+\.?\d*)',
+        'protein': r'(?:total protein|protein)[\s:]*(\d+\.?\d*)'
+    }
+    
+    text_lower = text.lower()
+    
+    # Extract values using regex
+    for test_name, pattern in patterns.items():
+        matches = re.findall(pattern, text_lower, re.IGNORECASE)
+        if matches:
+            try:
+                value = float(matches[0])
+                blood_values.append({
+                    'name': test_name.title(),
+                    'value': str(value),
+                    'unit': get_unit_for_test(test_name),
+                    'normalRange': get_normal_range(test_name),
+                    'status': assess_value(test_name, value)
+                })
+            except ValueError:
+                continue
+    
+    # Generate findings based on extracted values
+    for value in blood_values:
+        if value['status'] != 'normal':
+            key_findings.append(f"{value['name']}: {value['value']} {value['unit']} ({value['status']})")
+            
+            if value['status'] in ['high', 'low']:
+                risk_level = "Medium" if risk_level == "Low" else "High"
+    
+    # Match disease patterns across parameters
+    detected_patterns = rule_set.score(blood_values)
+    for pattern in detected_patterns:
+        key_findings.append(pattern['name'])
+        risk_level = max(risk_level, pattern['severity'].title(), key=RISK_LEVELS.index)
+    
+    # Generate recommendations
+    if not key_findings:
+        key_findings.append("All measured values appear to be within normal ranges")
+        recommendations.append("Continue current lifestyle and regular check-ups")
+    else:
+        recommendations.append("Consult with your healthcare provider about abnormal values")
+        recommendations.append("Consider lifestyle modifications if recommended by your doctor")
+        recommendations.append("Schedule follow-up tests as advised")
+    
+    for pattern in detected_patterns:
+        if pattern['recommendation']:
+            recommendations.append(pattern['recommendation'])
+    
+    if risk_level == "High":
+        recommendations.append("Urgent medical consultation recommended")
+    
+    return {
+        'bloodValues': blood_values,
+        'detectedPatterns': [
+            {'id': pattern['id'], 'name': pattern['name'], 'severity': pattern['severity']}
+            for pattern in detected_patterns
+        ],
+        'keyFindings': key_findings,
+        'recommendations': recommendations,
+        'riskLevel': risk_level,
+        'overallHealth': f"Based on analysis: {risk_level} risk level detected"
+    }
+
+
+def get_unit_for_test(test_name):
+    """Return appropriate unit for blood test"""
+    units = {
+        'hemoglobin': 'g/dL',
+        'wbc': '×10³/μL',
+        'rbc': '×10⁶/μL',
+        'platelet': '×10³/μL',
+        'hematocrit': '%',
+        'mcv': 'fL',
+        'mch': 'pg',
+        'mchc': 'g/dL',
+        'glucose': 'mg/dL',
+        'cholesterol': 'mg/dL',
+        'hdl': 'mg/dL',
+        'ldl': 'mg/dL',
+        'triglycerides': 'mg/dL',
+        'creatinine': 'mg/dL',
+        'urea': 'mg/dL',
+        'bilirubin': 'mg/dL',
+        'alt': 'U/L',
+        'ast': 'U/L',
+        'albumin': 'g/dL',
+        'protein': 'g/dL'
+    }
+    return units.get(test_name, 'units')
+
+
+def get_normal_range(test_name):
+    """Return normal range for blood test"""
+    ranges = {
+        'hemoglobin': '12.0-15.5',
+        'wbc': '4.5-11.0',
+        'rbc': '4.2-5.9',
+        'platelet': '150-450',
+        'hematocrit': '36-46',
+        'mcv': '80-100',
+        'mch': '27-32',
+        'mchc': '32-36',
+        'glucose': '70-100',
+        'cholesterol': '<200',
+        'hdl': '>40',
+        'ldl': '<100',
+        'triglycerides': '<150',
+        'creatinine': '0.6-1.2',
+        'urea': '7-20',
+        'bilirubin': '0.2-1.2',
+        'alt': '7-40',
+        'ast': '8-40',
+        'albumin': '3.5-5.0',
+        'protein': '6.0-8.3'
+    }
+    return ranges.get(test_name, 'N/A')
+
+
+def assess_value(test_name, value):
+    """Assess if value is normal, high, or low"""
+    normal_ranges = {
+        'hemoglobin': (12.0, 15.5),
+        'wbc': (4.5, 11.0),
+        'rbc': (4.2, 5.9),
+        'platelet': (150, 450),
+        'hematocrit': (36, 46),
+        'mcv': (80, 100),
+        'mch': (27, 32),
+        'mchc': (32, 36),
+        'glucose': (70, 100),
+        'cholesterol': (0, 200),
+        'hdl': (40, 999),  # HDL higher is better
+        'ldl': (0, 100),
+        'triglycerides': (0, 150),
+        'creatinine': (0.6, 1.2),
+        'urea': (7, 20),
+        'bilirubin': (0.2, 1.2),
+        'alt': (7, 40),
+        'ast': (8, 40),
+        'albumin': (3.5, 5.0),
+        'protein': (6.0, 8.3)
+    }
+    
+    if test_name in normal_ranges:
+        min_val, max_val = normal_ranges[test_name]
+        if value < min_val:
+            return 'low'
+        elif value > max_val:
+            return 'high'
+        else:
+            return 'normal'
+    
+    return 'normal'
@@ -0,0 +1,128 @@
+"""
+Result cache for analyze_blood_report
+Results are keyed on a hash of the normalized text plus the rules version and
+kept in a byte-capped in-process LRU, backed by BloodReport.analysis_key in
+the database
+"""
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+
+import orjson
+from sqlalchemy.exc import SQLAlchemyError
+
+from analysis import RULES_VERSION, analyze_blood_report
+from config import Config
+from models import BloodReport
+from value_codec import decode_analysis
+
+_whitespace = re.compile(r'\s+')
+
+
+def normalize_text(text):
+    """Lowercase and collapse whitespace so trivially different OCR output shares a key"""
+    return _whitespace.sub(' ', text.lower()).strip()
+
+
+def cache_key(normalized_text, version=RULES_VERSION):
+    """Hash normalized text together with the rules version"""
+    digest = hashlib.sha256(f"{version}:".encode())
+    digest.update(normalized_text.encode('utf-8'))
+    return digest.hexdigest()
+
+
+class AnalysisCache:
+    """Thread-safe LRU of encoded analysis results, capped by total bytes"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        # Decode outside the lock; every caller gets its own copy
+        return orjson.loads(payload)
+
+    def put(self, key, analysis):
+        payload = orjson.dumps(analysis)
+        if len(payload) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= len(previous)
+            self._entries[key] = payload
+            self.current_bytes += len(payload)
+            self._evict()
+
+    def resize(self, max_bytes):
+        """Change the byte cap, evicting least recently used entries to fit"""
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def _evict(self):
+        while self.current_bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.current_bytes -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+analysis_cache = AnalysisCache(Config.ANALYSIS_CACHE_MAX_BYTES)
+
+
+def init_analysis_cache(app):
+    """Size the shared cache from the app's ANALYSIS_CACHE_MAX_BYTES"""
+    analysis_cache.resize(app.config['ANALYSIS_CACHE_MAX_BYTES'])
+
+
+def lookup_persisted(key):
+    """Return a stored analysis with the same key, or None"""
+    try:
+        report = BloodReport.query.with_entities(
+            BloodReport.analysis_result, BloodReport.packed_values
+        ).filter(
+            BloodReport.analysis_key == key,
+            BloodReport.analysis_result.isnot(None)
+        ).first()
+    except SQLAlchemyError as e:
+        print(f"Analysis cache lookup failed: {e}")
+        return None
+    return decode_analysis(report.analysis_result, report.packed_values) if report else None
+
+
+def cached_analysis(text, persistent=False):
+    """Analyze text through the LRU and database tiers, returning (key, analysis)"""
+    normalized = normalize_text(text)
+    key = cache_key(normalized)
+
+    analysis = analysis_cache.get(key)
+    if analysis is not None:
+        return key, analysis
+
+    if persistent:
+        analysis = lookup_persisted(key)
+    if analysis is None:
+        analysis = analyze_blood_report(normalized)
+
+    analysis_cache.put(key, analysis)
+    return key, analysis
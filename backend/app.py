@@ -1,8 +1,9 @@
-import os
+import math
 import re
 import random
 import string
-from flask import Flask, request, jsonify
+import click
+from flask import Flask, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
 from flask_mail import Mail, Message
 from werkzeug.utils import secure_filename
@@ -10,28 +11,48 @@ import PyPDF2
 import pdfplumber
 import pytesseract
 from PIL import Image
-from pdf2image import convert_from_path
+from pdf2image import convert_from_path, pdfinfo_from_path
 from datetime import datetime, timedelta
+from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
 
 # Import database components
 from config import Config
 from models import db, User, BloodReport, BloodValue, PasswordResetToken
+from profiling import init_profiling, stage_timer
+from analysis import analyze_blood_report
+from analysis_cache import cached_analysis, init_analysis_cache, normalize_text
+from reanalysis import reanalyze_reports, score_stored_reports
+from search import init_search_index, index_report, rebuild_search_index, search_reports
+from value_codec import decode_analysis
+from json_provider import OrjsonProvider
+from comparison import compare_latest, compare_reports, compare_with_previous
+from storage import create_storage
+from retention import cleanup_uploads
 
 # Config
-UPLOAD_FOLDER = "uploads"
 ALLOWED_EXTENSIONS = {"pdf", "png", "jpg", "jpeg"}
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)  # orjson for every jsonify, with native datetime support
 app.config.from_object(Config)
-CORS(app)  # Enable CORS for all routes
+CORS(app, expose_headers=["Server-Timing", "X-Timing"])  # Enable CORS for all routes
 
 # Initialize database and mail
 db.init_app(app)
 mail = Mail(app)
 
-# Create uploads directory if it doesn't exist
-if not os.path.exists(UPLOAD_FOLDER):
-    os.makedirs(UPLOAD_FOLDER)
+# Stage timing, metrics and sampling profiler
+init_profiling(app)
+
+# Analysis result cache, sized from ANALYSIS_CACHE_MAX_BYTES
+init_analysis_cache(app)
+
+# SQLite FTS5 search table, needed by every stored upload; MySQL uses its FULLTEXT index
+with app.app_context():
+    init_search_index()
+
+# Content-addressed upload storage
+storage = create_storage(app.config)
 
 
 # Helper functions for OTP and email
@@ -124,214 +145,167 @@ def health_check():
     return jsonify({"status": "Backend server is running", "port": 5001})
 
 
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """Expose stage and request timings in Prometheus format"""
+    return Response(generate_latest(), mimetype=CONTENT_TYPE_LATEST)
+
+
 # Extract text from normal PDF
 def extract_text_pdf(path):
     text = ""
-    with pdfplumber.open(path) as pdf:
-        for page in pdf.pages:
-            text += page.extract_text() or ""
+    with stage_timer("extract_pdf"):
+        with pdfplumber.open(path) as pdf:
+            for page in pdf.pages:
+                text += page.extract_text() or ""
     return text.strip()
 
 
+# Extract text from normal PDF, one page at a time
+def iter_pdf_pages(path):
+    """Yield (page_number, page_count, text) as each page is extracted"""
+    with pdfplumber.open(path) as pdf:
+        page_count = len(pdf.pages)
+        for number, page in enumerate(pdf.pages, 1):
+            with stage_timer("extract_pdf"):
+                text = page.extract_text() or ""
+            yield number, page_count, text
+
+
 # Extract text from scanned PDF (OCR)
 def extract_text_ocr(path):
     text = ""
-    pages = convert_from_path(path)  # convert PDF → images
-    for page in pages:
-        text += pytesseract.image_to_string(page)
+    with stage_timer("pdf_to_images"):
+        pages = convert_from_path(path)  # convert PDF → images
+    with stage_timer("tesseract"):
+        for page in pages:
+            text += pytesseract.image_to_string(page)
     return text.strip()
 
 
-# Analyze blood report text
-def analyze_blood_report(text):
-    """
-    Extract blood test values and provide basic analysis
-    """
-    blood_values = []
-    key_findings = []
-    recommendations = []
-    risk_level = "Low"
-    
-    # Common blood test patterns - improved for better extraction
-    patterns = {
-        'hemoglobin': r'(?:hemoglobin|hgb|hb)[\s:]*(\d+\.?\d*)',
-        'wbc': r'(?:white blood cell|wbc|leucocyte|leukocyte)[\s:]*(\d+\.?\d*)',
-        'rbc': r'(?:red blood cell|rbc|erythrocyte)[\s:]*(\d+\.?\d*)',
-        'platelet': r'(?:platelet|plt)[\s:]*(\d+\.?\d*)',
-        'hematocrit': r'(?:hematocrit|hct)[\s:]*(\d+\.?\d*)',
-        'mcv': r'(?:mcv|mean corpuscular volume)[\s:]*(\d+\.?\d*)',
-        'mch': r'(?:mch|mean corpuscular hemoglobin)[\s:]*(\d+\.?\d*)',
-        'mchc': r'(?:mchc|mean corpuscular hemoglobin concentration)[\s:]*(\d+\.?\d*)',
-        'glucose': r'(?:glucose|sugar|blood sugar)[\s:]*(\d+\.?\d*)',
-        'cholesterol': r'(?:cholesterol|chol|total cholesterol)[\s:]*(\d+\.?\d*)',
-        'hdl': r'(?:hdl|high density lipoprotein)[\s:]*(\d+\.?\d*)',
-        'ldl': r'(?:ldl|low density lipoprotein)[\s:]*(\d+\.?\d*)',
-        'triglycerides': r'(?:triglyceride|trig|triglycerides)[\s:]*(\d+\.?\d*)',
-        'creatinine': r'(?:creatinine|crea)[\s:]*(\d+\.?\d*)',
-        'urea': r'(?:urea|bun|blood urea nitrogen)[\s:]*(\d+\.?\d*)',
-        'bilirubin': r'(?:bilirubin|bili|total bilirubin)[\s:]*(\d+\.?\d*)',
-        'alt': r'(?:alt|alanine aminotransferase|sgpt)[\s:]*(\d+\.?\d*)',
-        'ast': r'(?:ast|aspartate aminotransferase|sgot)[\s:]*(\d+\.?\d*)',
-        'albumin': r'(?:albumin|alb)[\s:]*(\d+\.?\d*)',
-        'protein': r'(?:total protein|protein)[\s:]*(\d+\.?\d*)'
-    }
-    
-    text_lower = text.lower()
-    
-    # Extract values using regex
-    for test_name, pattern in patterns.items():
-        matches = re.findall(pattern, text_lower, re.IGNORECASE)
-        if matches:
-            try:
-                value = float(matches[0])
-                blood_values.append({
-                    'name': test_name.title(),
-                    'value': str(value),
-                    'unit': get_unit_for_test(test_name),
-                    'normalRange': get_normal_range(test_name),
-                    'status': assess_value(test_name, value)
-                })
-            except ValueError:
-                continue
-    
-    # Generate findings based on extracted values
-    for value in blood_values:
-        if value['status'] != 'normal':
-            key_findings.append(f"{value['name']}: {value['value']} {value['unit']} ({value['status']})")
-            
-            if value['status'] in ['high', 'low']:
-                risk_level = "Medium" if risk_level == "Low" else "High"
-    
-    # Generate recommendations
-    if not key_findings:
-        key_findings.append("All measured values appear to be within normal ranges")
-        recommendations.append("Continue current lifestyle and regular check-ups")
-    else:
-        recommendations.append("Consult with your healthcare provider about abnormal values")
-        recommendations.append("Consider lifestyle modifications if recommended by your doctor")
-        recommendations.append("Schedule follow-up tests as advised")
-    
-    if risk_level == "High":
-        recommendations.append("Urgent medical consultation recommended")
-    
+# Extract text from scanned PDF (OCR), one page at a time
+def iter_ocr_pages(path):
+    """Yield (page_number, page_count, text), rendering only one page image at a time"""
+    page_count = pdfinfo_from_path(path)["Pages"]
+    for number in range(1, page_count + 1):
+        with stage_timer("pdf_to_images"):
+            images = convert_from_path(path, first_page=number, last_page=number)
+        with stage_timer("tesseract"):
+            text = "".join(pytesseract.image_to_string(image) for image in images)
+        yield number, page_count, text
+
+
+# Helper: page-by-page text extraction for streamed uploads
+def iter_report_pages(filepath, filename):
+    """Yield (stage, page_number, page_count, text), falling back to OCR for scanned PDFs"""
+    if filename.lower().endswith(".pdf"):
+        found_text = False
+        for number, page_count, text in iter_pdf_pages(filepath):
+            found_text = found_text or text.strip() != ""
+            yield "extract_pdf", number, page_count, text
+
+        if not found_text:
+            # If empty → scanned PDF → use OCR
+            for number, page_count, text in iter_ocr_pages(filepath):
+                yield "ocr", number, page_count, text
+
+    elif filename.lower().endswith(("png", "jpg", "jpeg")):
+        with stage_timer("tesseract"):
+            text = pytesseract.image_to_string(Image.open(filepath))
+        yield "ocr", 1, 1, text
+
+
+# Helper: persist an analyzed report and its values
+def save_report(user_id, filename, original_filename, storage_key, extracted_text, analysis, analysis_key):
+    """Store the report and its blood values for the user"""
+    report = BloodReport(
+        user_id=user_id,
+        filename=filename,
+        original_filename=original_filename,
+        file_path=storage_key,
+        extracted_text=extracted_text,
+        analysis_key=analysis_key,
+        analysis_date=datetime.utcnow()
+    )
+    report.analysis = analysis
+    db.session.add(report)
+    db.session.flush()
+    db.session.add_all(BloodValue.from_analysis(report.id, analysis))
+    index_report(report.id, user_id, extracted_text)
+    db.session.commit()
+    return report
+
+
+# Helper: validate and store an uploaded file
+def accept_upload():
+    """Return (upload, None) for a stored upload, or (None, error response)"""
+    if "file" not in request.files:
+        return None, (jsonify({"error": "No file part"}), 400)
+
+    file = request.files["file"]
+    if file.filename == "":
+        return None, (jsonify({"error": "No selected file"}), 400)
+
+    # Reports are only stored when the upload is tied to a user
+    user_id = request.form.get("user_id", type=int)
+    if user_id and not User.query.get(user_id):
+        return None, (jsonify({"error": "User not found"}), 404)
+
+    if not allowed_file(file.filename):
+        return None, (jsonify({"error": "File type not allowed"}), 400)
+
+    filename = secure_filename(file.filename)
+    with stage_timer("save"):
+        storage_key = storage.save(file.read(), filename)
+
     return {
-        'bloodValues': blood_values,
-        'keyFindings': key_findings,
-        'recommendations': recommendations,
-        'riskLevel': risk_level,
-        'overallHealth': f"Based on analysis: {risk_level} risk level detected"
+        "user_id": user_id,
+        "filename": filename,
+        "original_filename": file.filename,
+        "storage_key": storage_key
+    }, None
+
+
+# Helper: analyze extracted text and build the upload response
+def build_upload_result(upload, extracted_text):
+    """Analyze the text, store the report for the user and compare it with earlier ones"""
+    with stage_timer("analyze"):
+        analysis_key, analysis = cached_analysis(
+            extracted_text, persistent=app.config["ANALYSIS_CACHE_PERSISTENT"]
+        )
+
+    result = {
+        "success": True,
+        "filename": upload["filename"],
+        "extracted_text": extracted_text[:1000] + "..." if len(extracted_text) > 1000 else extracted_text,
+        "analysis": analysis
     }
 
+    user_id = upload["user_id"]
+    if user_id:
+        with stage_timer("save_report"):
+            report = save_report(user_id, upload["filename"], upload["original_filename"],
+                                 upload["storage_key"], extracted_text, analysis, analysis_key)
+        result["report_id"] = report.id
 
-def get_unit_for_test(test_name):
-    """Return appropriate unit for blood test"""
-    units = {
-        'hemoglobin': 'g/dL',
-        'wbc': '×10³/μL',
-        'rbc': '×10⁶/μL',
-        'platelet': '×10³/μL',
-        'hematocrit': '%',
-        'mcv': 'fL',
-        'mch': 'pg',
-        'mchc': 'g/dL',
-        'glucose': 'mg/dL',
-        'cholesterol': 'mg/dL',
-        'hdl': 'mg/dL',
-        'ldl': 'mg/dL',
-        'triglycerides': 'mg/dL',
-        'creatinine': 'mg/dL',
-        'urea': 'mg/dL',
-        'bilirubin': 'mg/dL',
-        'alt': 'U/L',
-        'ast': 'U/L',
-        'albumin': 'g/dL',
-        'protein': 'g/dL'
-    }
-    return units.get(test_name, 'units')
-
-
-def get_normal_range(test_name):
-    """Return normal range for blood test"""
-    ranges = {
-        'hemoglobin': '12.0-15.5',
-        'wbc': '4.5-11.0',
-        'rbc': '4.2-5.9',
-        'platelet': '150-450',
-        'hematocrit': '36-46',
-        'mcv': '80-100',
-        'mch': '27-32',
-        'mchc': '32-36',
-        'glucose': '70-100',
-        'cholesterol': '<200',
-        'hdl': '>40',
-        'ldl': '<100',
-        'triglycerides': '<150',
-        'creatinine': '0.6-1.2',
-        'urea': '7-20',
-        'bilirubin': '0.2-1.2',
-        'alt': '7-40',
-        'ast': '8-40',
-        'albumin': '3.5-5.0',
-        'protein': '6.0-8.3'
-    }
-    return ranges.get(test_name, 'N/A')
-    return ranges.get(test_name, 'varies')
-
-
-def assess_value(test_name, value):
-    """Assess if value is normal, high, or low"""
-    normal_ranges = {
-        'hemoglobin': (12.0, 15.5),
-        'wbc': (4.5, 11.0),
-        'rbc': (4.2, 5.9),
-        'platelet': (150, 450),
-        'hematocrit': (36, 46),
-        'mcv': (80, 100),
-        'mch': (27, 32),
-        'mchc': (32, 36),
-        'glucose': (70, 100),
-        'cholesterol': (0, 200),
-        'hdl': (40, 999),  # HDL higher is better
-        'ldl': (0, 100),
-        'triglycerides': (0, 150),
-        'creatinine': (0.6, 1.2),
-        'urea': (7, 20),
-        'bilirubin': (0.2, 1.2),
-        'alt': (7, 40),
-        'ast': (8, 40),
-        'albumin': (3.5, 5.0),
-        'protein': (6.0, 8.3)
-    }
-    
-    if test_name in normal_ranges:
-        min_val, max_val = normal_ranges[test_name]
-        if value < min_val:
-            return 'low'
-        elif value > max_val:
-            return 'high'
-        else:
-            return 'normal'
-    
-    return 'normal'
+        # Compare against the user's previous report
+        with stage_timer("compare"):
+            result["comparison"] = compare_with_previous(report)
+
+    return result
 
 
 @app.route("/upload", methods=["POST"])
 def upload_file():
-    if "file" not in request.files:
-        return jsonify({"error": "No file part"}), 400
+    upload, error = accept_upload()
+    if error:
+        return error
 
-    file = request.files["file"]
-    if file.filename == "":
-        return jsonify({"error": "No selected file"}), 400
-
-    if file and allowed_file(file.filename):
-        filename = secure_filename(file.filename)
-        filepath = os.path.join(app.config["UPLOAD_FOLDER"], filename)
-        file.save(filepath)
-
-        extracted_text = ""
+    filename = upload["filename"]
+    extracted_text = ""
 
-        try:
+    try:
+        with storage.local_file(upload["storage_key"]) as filepath:
             if filename.lower().endswith(".pdf"):
                 # Try extracting normally first
                 text = extract_text_pdf(filepath)
@@ -343,24 +317,198 @@ def upload_file():
                     extracted_text = text
 
             elif filename.lower().endswith(("png", "jpg", "jpeg")):
-                extracted_text = pytesseract.image_to_string(Image.open(filepath))
+                with stage_timer("tesseract"):
+                    extracted_text = pytesseract.image_to_string(Image.open(filepath))
 
-            # Analyze the extracted text
-            analysis = analyze_blood_report(extracted_text)
-            
-            return jsonify({
-                "success": True,
-                "filename": filename,
-                "extracted_text": extracted_text[:1000] + "..." if len(extracted_text) > 1000 else extracted_text,
-                "analysis": analysis
-            })
+        return jsonify(build_upload_result(upload, extracted_text))
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            "error": f"Error processing file: {str(e)}"
+        }), 500
+
+
+# Helper: format one Server-Sent Event
+def sse_event(event, data):
+    return f"event: {event}\ndata: {app.json.dumps(data)}\n\n"
+
+
+@app.route("/upload/stream", methods=["POST"])
+def upload_file_stream():
+    """Upload a report and stream progress as Server-Sent Events
+
+    Emits "stage" and "page" events while text is extracted, "values" with the
+    blood values first found on each finished page, then a final "result" with
+    the same body as /upload (or "error").
+    """
+    upload, error = accept_upload()
+    if error:
+        return error
+
+    def generate():
+        yield sse_event("stage", {"stage": "saved", "filename": upload["filename"]})
+        try:
+            pages = []
+            seen = set()
+            current_stage = None
+            with storage.local_file(upload["storage_key"]) as filepath:
+                for stage, number, page_count, text in iter_report_pages(filepath, upload["filename"]):
+                    if stage != current_stage:
+                        current_stage = stage
+                        pages = []  # OCR replaces the empty text layer
+                        yield sse_event("stage", {"stage": stage, "pages": page_count})
+                    pages.append(text)
+                    yield sse_event("page", {"stage": stage, "page": number, "pages": page_count})
+
+                    # Push values as soon as the page holding them is done
+                    found = [
+                        value for value in analyze_blood_report(normalize_text(text))["bloodValues"]
+                        if value["name"] not in seen
+                    ]
+                    if found:
+                        seen.update(value["name"] for value in found)
+                        yield sse_event("values", {"page": number, "bloodValues": found})
+
+            yield sse_event("stage", {"stage": "analyze"})
+            yield sse_event("result", build_upload_result(upload, "".join(pages).strip()))
 
         except Exception as e:
-            return jsonify({
-                "error": f"Error processing file: {str(e)}"
-            }), 500
+            db.session.rollback()
+            yield sse_event("error", {"error": f"Error processing file: {str(e)}"})
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.route("/reports", methods=["GET"])
+def list_reports():
+    """List a user's analyzed reports, newest first"""
+    try:
+        user_id = request.args.get('user_id', type=int)
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = min(max(request.args.get('per_page', 20, type=int), 1), 100)
+        
+        if not user_id:
+            return jsonify({"error": "user_id is required"}), 400
+        
+        # Select columns only and decode the packed values straight into the response;
+        # the JSON provider encodes the datetimes natively
+        rows = db.session.query(
+            BloodReport.id,
+            BloodReport.filename,
+            BloodReport.original_filename,
+            BloodReport.upload_date,
+            BloodReport.analysis_date,
+            BloodReport.analysis_result,
+            BloodReport.packed_values
+        ).filter(
+            BloodReport.user_id == user_id
+        ).order_by(
+            BloodReport.upload_date.desc(), BloodReport.id.desc()
+        ).offset((page - 1) * per_page).limit(per_page).all()
+        
+        reports = [{
+            'id': row.id,
+            'filename': row.filename,
+            'original_filename': row.original_filename,
+            'upload_date': row.upload_date,
+            'analysis_date': row.analysis_date,
+            'analysis': decode_analysis(row.analysis_result, row.packed_values)
+        } for row in rows]
+        
+        return jsonify({
+            "success": True,
+            "page": page,
+            "per_page": per_page,
+            "reports": reports
+        }), 200
+        
+    except Exception as e:
+        return jsonify({"error": f"Failed to fetch reports: {str(e)}"}), 500
+
+
+@app.route("/reports/compare", methods=["POST"])
+def compare_reports_endpoint():
+    """Compare two of a user's reports, or each parameter's latest value with the previous one"""
+    try:
+        data = request.get_json() or {}
+        
+        try:
+            user_id = int(data['user_id']) if data.get('user_id') else None
+            report_id = int(data['report_id']) if data.get('report_id') else None
+            baseline_report_id = int(data['baseline_report_id']) if data.get('baseline_report_id') else None
+        except (TypeError, ValueError):
+            return jsonify({"error": "user_id, report_id and baseline_report_id must be integers"}), 400
+        
+        if not user_id:
+            return jsonify({"error": "user_id is required"}), 400
+        
+        try:
+            threshold = float(data.get('threshold', 10))
+        except (TypeError, ValueError):
+            threshold = None
+        # float() also accepts "nan" and "inf", which would flag every change or none
+        if threshold is None or not math.isfinite(threshold) or threshold < 0:
+            return jsonify({"error": "threshold must be a non-negative number"}), 400
+        
+        if report_id or baseline_report_id:
+            if not (report_id and baseline_report_id):
+                return jsonify({"error": "report_id and baseline_report_id must be given together"}), 400
+            
+            # Both reports must belong to the user
+            owned = BloodReport.query.filter(
+                BloodReport.id.in_([report_id, baseline_report_id]),
+                BloodReport.user_id == user_id
+            ).count()
+            if owned != len({report_id, baseline_report_id}):
+                return jsonify({"error": "Report not found"}), 404
+            
+            comparison = compare_reports(report_id, baseline_report_id, threshold)
+        else:
+            comparison = compare_latest(user_id, threshold)
+        
+        return jsonify({
+            "success": True,
+            "comparison": comparison
+        }), 200
+        
+    except Exception as e:
+        return jsonify({"error": f"Comparison failed: {str(e)}"}), 500
+
 
-    return jsonify({"error": "File type not allowed"}), 400
+@app.route("/reports/search", methods=["GET"])
+def search_reports_endpoint():
+    """Full-text search over a user's extracted report text"""
+    try:
+        query = request.args.get('q', '').strip()
+        user_id = request.args.get('user_id', type=int)
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = min(max(request.args.get('per_page', 20, type=int), 1), 100)
+        
+        if not query:
+            return jsonify({"error": "Search query is required"}), 400
+        
+        if not user_id:
+            return jsonify({"error": "user_id is required"}), 400
+        
+        total, results = search_reports(user_id, query, page, per_page)
+        
+        return jsonify({
+            "success": True,
+            "query": query,
+            "page": page,
+            "per_page": per_page,
+            "total": total,
+            "results": results
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": f"Search failed: {str(e)}"}), 500
 
 
 @app.route("/signup", methods=["POST"])
@@ -602,6 +750,51 @@ def get_users():
         return jsonify({"error": f"Failed to fetch users: {str(e)}"}), 500
 
 
+@app.cli.command("reanalyze-reports")
+@click.option("--chunk-size", default=500, show_default=True, help="Reports loaded per batch")
+@click.option("--workers", default=None, type=int, help="Analysis processes (default: CPU count)")
+def reanalyze_reports_command(chunk_size, workers):
+    """Re-run analysis over stored reports whose text or rules changed"""
+    stats = reanalyze_reports(chunk_size=chunk_size, workers=workers)
+    print(f"Scanned {stats['scanned']} reports: {stats['reanalyzed']} reanalyzed, {stats['skipped']} unchanged")
+
+
+@app.cli.command("score-reports")
+@click.option("--chunk-size", default=50000, show_default=True, help="Reports scored per batch")
+def score_reports_command(chunk_size):
+    """Count how often each disease-pattern rule fires across stored reports"""
+    scored, counts = score_stored_reports(chunk_size=chunk_size)
+    print(f"Scored {scored} reports")
+    for rule_id, hits in counts.items():
+        print(f"  {rule_id:<28} {hits}")
+
+
+@app.cli.command("reindex-reports")
+@click.option("--chunk-size", default=1000, show_default=True, help="Reports indexed per batch")
+def reindex_reports_command(chunk_size):
+    """Rebuild the local full-text search index from stored reports"""
+    indexed = rebuild_search_index(chunk_size=chunk_size)
+    print(f"Indexed {indexed} reports")
+
+
+@app.cli.command("cleanup-uploads")
+@click.option("--batch-size", default=500, show_default=True, help="Reports and stored files handled per batch")
+@click.option("--retention-days", default=None, type=int, help="Override UPLOAD_RETENTION_DAYS (0 keeps report files)")
+@click.option("--dry-run", is_flag=True, help="Count what would be removed without changing anything")
+def cleanup_uploads_command(batch_size, retention_days, dry_run):
+    """Expire report files past the retention period and delete unreferenced uploads"""
+    if retention_days is None:
+        retention_days = app.config["UPLOAD_RETENTION_DAYS"]
+    try:
+        stats = cleanup_uploads(storage, retention_days, app.config["UPLOAD_ORPHAN_GRACE_HOURS"],
+                                batch_size=batch_size, dry_run=dry_run)
+    except RuntimeError as e:
+        raise click.ClickException(str(e))
+    note = " (dry run)" if dry_run else ""
+    print(f"Expired {stats['expired']} report files, deleted {stats['deleted']} of "
+          f"{stats['scanned']} stored files{note}")
+
+
 if __name__ == "__main__":
     # Create tables if they don't exist
     with app.app_context():
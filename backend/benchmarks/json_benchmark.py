@@ -0,0 +1,100 @@
+"""
+JSON encoding benchmark: serializing BloodValue records for a response
+
+Compares Flask's stdlib-based provider with per-field isoformat() (the
+previous to_dict) against OrjsonProvider with to_dict returning raw datetimes.
+Both go through provider.response(), so the bytes timed are the bytes a
+jsonify call would send.
+
+Usage (from the backend directory):
+    python benchmarks/json_benchmark.py --records 100000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+from flask import Flask  # noqa: E402
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+
+from json_provider import OrjsonProvider  # noqa: E402
+from models import BloodValue  # noqa: E402
+from value_codec import PARAMETERS, UNITS, NORMAL_RANGES, STATUSES  # noqa: E402
+
+
+def legacy_to_dict(value):
+    """BloodValue.to_dict as it was before the orjson provider"""
+    return {
+        'id': value.id,
+        'report_id': value.report_id,
+        'parameter_name': value.parameter_name,
+        'value': str(value.value),
+        'unit': value.unit,
+        'normal_range': value.normal_range,
+        'status': value.status,
+        'created_at': value.created_at.isoformat()
+    }
+
+
+def make_values(count):
+    rng = random.Random(0)
+    start = datetime(2025, 1, 1)
+    return [
+        BloodValue(
+            id=i,
+            report_id=i // 20,
+            parameter_code=rng.randrange(len(PARAMETERS)),
+            unit_code=rng.randrange(len(UNITS)),
+            range_code=rng.randrange(len(NORMAL_RANGES)),
+            value=round(rng.uniform(0, 500), 1),
+            status=rng.choice(STATUSES),
+            created_at=start + timedelta(seconds=i)
+        )
+        for i in range(count)
+    ]
+
+
+def best_of(func, rounds):
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON encoding benchmark")
+    parser.add_argument('--records', type=int, default=100000)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    stdlib = DefaultJSONProvider(app)
+    fast = OrjsonProvider(app)
+    values = make_values(args.records)
+
+    cases = {
+        'stdlib (isoformat + json)': lambda: stdlib.response({'values': [legacy_to_dict(v) for v in values]}),
+        'orjson (to_dict + orjson)': lambda: fast.response({'values': [v.to_dict() for v in values]}),
+    }
+
+    print(f"Serializing {args.records} BloodValue records (best of {args.rounds})")
+    baseline = None
+    for name, func in cases.items():
+        seconds, response = best_of(func, args.rounds)
+        payload = response.get_data()
+        baseline = baseline or seconds
+        print(f"{name:<30} {seconds * 1000:9.1f} ms  {args.records / seconds:12.0f} rec/s  "
+              f"{len(payload) / 1e6:6.1f} MB  {baseline / seconds:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
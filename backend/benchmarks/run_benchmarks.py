@@ -0,0 +1,257 @@
+"""
+Benchmark runner for text extraction, OCR, analysis and the /upload endpoint
+
+Usage (from the backend directory):
+    python benchmarks/run_benchmarks.py                      # run and save results
+    python benchmarks/run_benchmarks.py --save-baseline      # store as the baseline
+    python benchmarks/run_benchmarks.py --compare            # flag regressions vs baseline
+    python benchmarks/run_benchmarks.py --filter analyze --compare other.json
+
+Benchmarks that need Tesseract or Poppler are recorded as skipped when
+those binaries are missing. --compare exits with status 1 on regressions.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+
+# app.py creates its upload storage relative to the working directory
+os.chdir(BACKEND_DIR)
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+import app as backend  # noqa: E402
+import analysis  # noqa: E402
+import analysis_cache  # noqa: E402
+import synthetic_reports  # noqa: E402
+from storage import LocalStorage, UploadStorage  # noqa: E402
+
+SAMPLE_UPLOADS = os.path.join(BACKEND_DIR, 'uploads')
+
+
+class Skip(Exception):
+    """Raised by a benchmark whose external dependency is unavailable"""
+
+
+def time_call(func, repeat, warmup=1):
+    """Run func repeatedly and return timing statistics in seconds"""
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return {
+        'runs': repeat,
+        'min': min(samples),
+        'median': statistics.median(samples),
+        'mean': statistics.mean(samples),
+        'max': max(samples)
+    }
+
+
+def ocr_guard(func):
+    """Turn missing Tesseract/Poppler errors into a skip"""
+    def wrapper():
+        try:
+            return func()
+        except backend.pytesseract.TesseractNotFoundError:
+            raise Skip("tesseract not installed")
+        except Exception as e:
+            if 'poppler' in str(e).lower():
+                raise Skip("poppler not installed")
+            raise
+    return wrapper
+
+
+def build_benchmarks(workdir, sizes, quick):
+    """Return (name, callable, repeat) tuples for every benchmark"""
+    benchmarks = []
+
+    # analyze_blood_report on synthetic text of growing size
+    for pages in sizes:
+        text = synthetic_reports.generate_report_text(pages)
+        repeat = max(3, 200 // pages)
+        benchmarks.append((
+            f"analyze_blood_report[pages={pages}]",
+            lambda text=text: analysis.analyze_blood_report(text),
+            repeat
+        ))
+        # Warm cache hit, as seen by repeated uploads of the same report
+        benchmarks.append((
+            f"cached_analysis[pages={pages},hit]",
+            lambda text=text: analysis_cache.cached_analysis(text),
+            repeat
+        ))
+
+    # Text extraction from generated PDFs
+    for pages in (1, 10) if quick else (1, 10, 100):
+        path = os.path.join(workdir, f"synthetic_{pages}.pdf")
+        synthetic_reports.write_report_pdf(path, pages)
+        benchmarks.append((
+            f"extract_text_pdf[pages={pages}]",
+            lambda path=path: backend.extract_text_pdf(path),
+            max(3, 30 // pages)
+        ))
+
+    # Text extraction from the sample reports shipped in uploads/
+    for name in ('BloodReport.pdf', 'BloodReport_2.pdf'):
+        path = os.path.join(SAMPLE_UPLOADS, name)
+        if os.path.exists(path):
+            benchmarks.append((
+                f"extract_text_pdf[{name}]",
+                lambda path=path: backend.extract_text_pdf(path),
+                10
+            ))
+
+    # OCR of a scanned PDF
+    scanned_path = os.path.join(workdir, 'scanned_2.pdf')
+    synthetic_reports.write_scanned_pdf(scanned_path, pages=2)
+    benchmarks.append((
+        "extract_text_ocr[pages=2]",
+        ocr_guard(lambda: backend.extract_text_ocr(scanned_path)),
+        3
+    ))
+
+    # Image OCR on the sample photo and a generated page
+    image_path = os.path.join(workdir, 'synthetic.png')
+    synthetic_reports.write_report_image(image_path)
+    for label, path in (
+        ('synthetic.png', image_path),
+        ('bloodreport3.jpg', os.path.join(SAMPLE_UPLOADS, 'bloodreport3.jpg'))
+    ):
+        if os.path.exists(path):
+            benchmarks.append((
+                f"image_ocr[{label}]",
+                ocr_guard(lambda path=path: backend.pytesseract.image_to_string(
+                    backend.Image.open(path))),
+                3
+            ))
+
+    # End-to-end /upload through the Flask test client
+    # Measure the cold path: no database tier and an empty LRU for every upload
+    backend.app.config['ANALYSIS_CACHE_PERSISTENT'] = False
+    backend.storage = UploadStorage(LocalStorage(os.path.join(workdir, 'uploads')))
+    client = backend.app.test_client()
+
+    def upload(path, filename):
+        analysis_cache.analysis_cache.clear()
+        with open(path, 'rb') as f:
+            response = client.post('/upload', data={'file': (f, filename)})
+        if response.status_code != 200:
+            error = (response.get_json() or {}).get('error', '')
+            if 'tesseract' in error.lower():
+                raise Skip("tesseract not installed")
+            raise RuntimeError(f"/upload returned {response.status_code}: {error}")
+
+    pdf_path = os.path.join(workdir, 'synthetic_1.pdf')
+    benchmarks.append((
+        "upload[pdf,pages=1]",
+        lambda: upload(pdf_path, 'synthetic_1.pdf'),
+        10
+    ))
+    benchmarks.append((
+        "upload[png]",
+        ocr_guard(lambda: upload(image_path, 'synthetic.png')),
+        3
+    ))
+
+    return benchmarks
+
+
+def run(args):
+    """Run the selected benchmarks and return the results document"""
+    sizes = [1, 10, 100] if args.quick else [1, 10, 100, 1000]
+    results = {}
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, func, repeat in build_benchmarks(workdir, sizes, args.quick):
+            if args.filter and args.filter not in name:
+                continue
+            try:
+                stats = time_call(func, args.repeat or repeat)
+                print(f"{name:<45} median {stats['median'] * 1000:10.3f} ms")
+            except Skip as e:
+                stats = {'skipped': str(e)}
+                print(f"{name:<45} skipped ({e})")
+            results[name] = stats
+
+    return {
+        'meta': {
+            'timestamp': datetime.utcnow().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform()
+        },
+        'benchmarks': results
+    }
+
+
+def compare(current, baseline, threshold):
+    """Print a comparison table and return the names that regressed"""
+    regressions = []
+    print(f"\n{'benchmark':<45} {'baseline':>12} {'current':>12} {'change':>9}")
+    for name, stats in current['benchmarks'].items():
+        base = baseline['benchmarks'].get(name)
+        if not base or 'median' not in base or 'median' not in stats:
+            continue
+        change = stats['median'] / base['median'] - 1
+        flag = ''
+        if change > threshold:
+            flag = '  REGRESSION'
+            regressions.append(name)
+        print(f"{name:<45} {base['median'] * 1000:10.3f}ms {stats['median'] * 1000:10.3f}ms "
+              f"{change:+8.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Blood-Sight backend benchmarks")
+    parser.add_argument('--filter', help="Only run benchmarks whose name contains this")
+    parser.add_argument('--repeat', type=int, help="Override the repeat count for every benchmark")
+    parser.add_argument('--quick', action='store_true', help="Skip the largest inputs")
+    parser.add_argument('--output', help="Results file (default: results/<timestamp>.json)")
+    parser.add_argument('--save-baseline', action='store_true', help="Also store results as the baseline")
+    parser.add_argument('--compare', nargs='?', const=DEFAULT_BASELINE, metavar='BASELINE',
+                        help="Compare against a baseline (default: benchmarks/baseline.json)")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="Relative median slowdown flagged as a regression (default: 0.2)")
+    args = parser.parse_args()
+
+    current = run(args)
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}.json")
+    with open(output, 'w') as f:
+        json.dump(current, f, indent=2)
+    print(f"\nResults saved to {output}")
+
+    if args.save_baseline:
+        with open(DEFAULT_BASELINE, 'w') as f:
+            json.dump(current, f, indent=2)
+        print(f"Baseline saved to {DEFAULT_BASELINE}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}")
+            sys.exit(1)
+        print("\nNo regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Search latency benchmark over a large synthetic report corpus (SQLite FTS5)
+
+Usage (from the backend directory):
+    python benchmarks/search_benchmark.py --reports 1000000 --users 20000
+    python benchmarks/search_benchmark.py --reports 100000 --db /tmp/search.db --keep
+
+Builds the corpus in a scratch SQLite database, indexes it with the same
+code path as the app, then times GET /reports/search queries per user.
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+import synthetic_reports  # noqa: E402
+
+LAB_NAMES = [f"{city} Diagnostics Laboratory" for city in (
+    'Anand', 'Surat', 'Vadodara', 'Rajkot', 'Pune', 'Mumbai', 'Delhi', 'Chennai',
+    'Kolkata', 'Jaipur', 'Indore', 'Bhopal', 'Nagpur', 'Lucknow', 'Patna', 'Kochi'
+)]
+
+RARE_FINDINGS = [
+    'Occasional blast cells noted, suggest bone marrow correlation.',
+    'Target cells seen on peripheral smear.',
+    'Schistocytes present.',
+]
+
+QUERIES = ['"blast cells"', 'target cells', '"Surat Diagnostics"', 'hemoglobin', 'schistocytes']
+
+
+def report_text(rng, page_templates):
+    """Vary a cached page with a lab name and an occasional rare finding"""
+    lines = [rng.choice(LAB_NAMES)] + rng.choice(page_templates)
+    if rng.random() < 0.02:
+        lines.append(rng.choice(RARE_FINDINGS))
+    return "\n".join(lines)
+
+
+def build_corpus(app, db, reports, users, batch_size=5000):
+    """Insert users and reports with raw executemany, then index them"""
+    from models import User, BloodReport
+    from search import rebuild_search_index
+
+    rng = random.Random(0)
+    page_templates = [synthetic_reports.generate_page_lines(rng)[1:] for _ in range(200)]
+    now = datetime.utcnow()
+
+    with app.app_context():
+        db.create_all()
+        db.session.execute(User.__table__.insert(), [
+            {'id': i, 'name': f"user{i}", 'email': f"user{i}@example.com",
+             'password_hash': 'x', 'created_at': now, 'updated_at': now}
+            for i in range(1, users + 1)
+        ])
+        for start in range(0, reports, batch_size):
+            db.session.execute(BloodReport.__table__.insert(), [
+                {'user_id': rng.randint(1, users), 'filename': f"report_{i}.pdf",
+                 'original_filename': f"report_{i}.pdf", 'file_path': f"uploads/report_{i}.pdf",
+                 'extracted_text': report_text(rng, page_templates), 'upload_date': now}
+                for i in range(start, min(start + batch_size, reports))
+            ])
+        db.session.commit()
+
+        start = time.perf_counter()
+        indexed = rebuild_search_index(chunk_size=batch_size)
+        return indexed, time.perf_counter() - start
+
+
+def time_queries(client, users, samples):
+    """Time each query against random users and return latency percentiles in ms"""
+    rng = random.Random(1)
+    results = {}
+    for query in QUERIES:
+        latencies = []
+        for _ in range(samples):
+            start = time.perf_counter()
+            response = client.get('/reports/search', query_string={
+                'q': query, 'user_id': rng.randint(1, users)
+            })
+            latencies.append((time.perf_counter() - start) * 1000)
+            assert response.status_code == 200, response.get_json()
+        latencies.sort()
+        results[query] = {
+            'p50_ms': statistics.median(latencies),
+            'p95_ms': latencies[int(len(latencies) * 0.95) - 1],
+            'max_ms': latencies[-1]
+        }
+        print(f"{query:<22} p50 {results[query]['p50_ms']:8.2f} ms   p95 {results[query]['p95_ms']:8.2f} ms")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full-text search latency benchmark")
+    parser.add_argument('--reports', type=int, default=100000)
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--samples', type=int, default=200, help="Queries timed per search term")
+    parser.add_argument('--db', help="SQLite file to use (default: a temporary file)")
+    parser.add_argument('--keep', action='store_true', help="Reuse an already populated --db")
+    parser.add_argument('--output', help="Write results as JSON")
+    args = parser.parse_args()
+
+    db_path = args.db or os.path.join(tempfile.mkdtemp(), 'search.db')
+    reuse = args.keep and os.path.exists(db_path)
+    os.environ['DATABASE_URL'] = f"sqlite:///{db_path}"
+    os.chdir(BACKEND_DIR)
+
+    import app as backend
+    from models import db
+
+    if reuse:
+        indexed, index_seconds = args.reports, None
+    else:
+        print(f"Building {args.reports} reports for {args.users} users in {db_path}")
+        indexed, index_seconds = build_corpus(backend.app, db, args.reports, args.users)
+        print(f"Indexed {indexed} reports in {index_seconds:.1f}s")
+
+    latencies = time_queries(backend.app.test_client(), args.users, args.samples)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'reports': indexed, 'users': args.users,
+                'index_seconds': index_seconds, 'queries': latencies
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Storage size and (de)serialization throughput for stored analyses
+
+Compares the previous layout (analysis_result as a JSON column, blood_values
+with string columns) against value_codec (orjson summary + packed values,
+dictionary-encoded blood_values).
+
+Usage (from the backend directory):
+    python benchmarks/storage_benchmark.py --reports 20000
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+import synthetic_reports  # noqa: E402
+from analysis import analyze_blood_report  # noqa: E402
+from value_codec import decode_analysis, encode_analysis  # noqa: E402
+
+# Payload bytes of one compact blood_values row: three SMALLINT codes, a DOUBLE and the status enum
+COMPACT_ROW_BYTES = 2 + 2 + 2 + 8 + 1
+
+
+def legacy_row_bytes(blood_value):
+    """Payload bytes of one string-column blood_values row"""
+    return sum(len(blood_value[key].encode('utf-8')) for key in ('name', 'value', 'unit', 'normalRange')) + 1
+
+
+def throughput(func, items, rounds=3):
+    """Best-of items per second for func applied to every item"""
+    rates = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for item in items:
+            func(item)
+        rates.append(len(items) / (time.perf_counter() - start))
+    return max(rates)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analysis storage benchmark")
+    parser.add_argument('--reports', type=int, default=20000)
+    args = parser.parse_args()
+
+    analyses = [
+        analyze_blood_report(synthetic_reports.generate_report_text(1, seed))
+        for seed in range(args.reports)
+    ]
+
+    legacy = [json.dumps(analysis).encode('utf-8') for analysis in analyses]
+    compact = [encode_analysis(analysis) for analysis in analyses]
+
+    legacy_rows = statistics.mean(sum(map(legacy_row_bytes, a['bloodValues'])) for a in analyses)
+    compact_rows = statistics.mean(len(a['bloodValues']) * COMPACT_ROW_BYTES for a in analyses)
+    results = {
+        'analysis_result bytes/report': (
+            statistics.mean(map(len, legacy)),
+            statistics.mean(len(summary) + len(packed) for summary, packed in compact)
+        ),
+        'blood_values payload bytes/report': (legacy_rows, compact_rows),
+        'encode reports/s': (
+            throughput(json.dumps, analyses),
+            throughput(encode_analysis, analyses)
+        ),
+        'decode reports/s': (
+            throughput(json.loads, legacy),
+            throughput(lambda pair: decode_analysis(*pair), compact)
+        ),
+    }
+
+    print(f"{'metric':<36} {'before':>12} {'after':>12} {'ratio':>8}")
+    for metric, (before, after) in results.items():
+        print(f"{metric:<36} {before:12.1f} {after:12.1f} {after / before:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
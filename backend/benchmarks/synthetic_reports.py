@@ -0,0 +1,141 @@
+"""
+Synthetic blood report generator for benchmarks
+Produces report text, text PDFs (reportlab), images and scanned-style PDFs
+of any size so extraction and analysis can be measured at scale
+
+Usage:
+    python benchmarks/synthetic_reports.py --pages 5000 big_report.pdf
+    python benchmarks/synthetic_reports.py --image report.png
+"""
+
+import argparse
+import random
+
+# (label as printed on the report, unit, normal low, normal high)
+PARAMETERS = [
+    ('Hemoglobin', 'g/dL', 12.0, 15.5),
+    ('WBC', '10^3/uL', 4.5, 11.0),
+    ('RBC', '10^6/uL', 4.2, 5.9),
+    ('Platelet', '10^3/uL', 150, 450),
+    ('Hematocrit', '%', 36, 46),
+    ('MCV', 'fL', 80, 100),
+    ('MCH', 'pg', 27, 32),
+    ('MCHC', 'g/dL', 32, 36),
+    ('Glucose', 'mg/dL', 70, 100),
+    ('Cholesterol', 'mg/dL', 120, 200),
+    ('HDL', 'mg/dL', 40, 60),
+    ('LDL', 'mg/dL', 50, 100),
+    ('Triglycerides', 'mg/dL', 50, 150),
+    ('Creatinine', 'mg/dL', 0.6, 1.2),
+    ('Urea', 'mg/dL', 7, 20),
+    ('Bilirubin', 'mg/dL', 0.2, 1.2),
+    ('ALT', 'U/L', 7, 40),
+    ('AST', 'U/L', 8, 40),
+    ('Albumin', 'g/dL', 3.5, 5.0),
+    ('Total Protein', 'g/dL', 6.0, 8.3),
+]
+
+HEADER_LINES = [
+    'City Diagnostics Laboratory',
+    'Complete Blood Count and Biochemistry Panel',
+    'Patient: Synthetic Patient    Age: 42    Sex: F',
+    'Sample collected: 2025-08-22    Reported: 2025-08-23',
+    '',
+    'Test                 Result     Unit        Reference',
+]
+
+FOOTER_LINES = [
+    '',
+    'Peripheral smear: normocytic normochromic red cells, no blast cells seen.',
+    'Interpretation should be correlated clinically.',
+    'Authorised signatory: Dr. A. Example, MD Pathology',
+]
+
+
+def generate_page_lines(rng):
+    """Return the text lines for a single report page"""
+    lines = list(HEADER_LINES)
+    for label, unit, low, high in PARAMETERS:
+        # Spread values a little beyond the normal range so statuses vary
+        span = high - low
+        value = rng.uniform(low - span * 0.3, high + span * 0.3)
+        lines.append(f"{label:<20} {value:<10.1f} {unit:<11} {low}-{high}")
+    lines.extend(FOOTER_LINES)
+    return lines
+
+
+def generate_report_text(pages=1, seed=0):
+    """Generate plain report text spanning the given number of pages"""
+    rng = random.Random(seed)
+    return "\n\n".join("\n".join(generate_page_lines(rng)) for _ in range(pages))
+
+
+def write_report_pdf(path, pages=1, seed=0):
+    """Write a text-based PDF report with one panel per page"""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
+    rng = random.Random(seed)
+    pdf = canvas.Canvas(path, pagesize=A4)
+    _, height = A4
+    for _ in range(pages):
+        text = pdf.beginText(40, height - 50)
+        text.setFont('Courier', 10)
+        for line in generate_page_lines(rng):
+            text.textLine(line)
+        pdf.drawText(text)
+        pdf.showPage()
+    pdf.save()
+    return path
+
+
+def render_report_image(seed=0):
+    """Render a single report page to a PIL image, as a scanner would"""
+    from PIL import Image, ImageDraw, ImageFont
+
+    rng = random.Random(seed)
+    image = Image.new('L', (1240, 1754), color=255)
+    draw = ImageDraw.Draw(image)
+    try:
+        font = ImageFont.truetype('DejaVuSansMono.ttf', 22)
+    except OSError:
+        font = ImageFont.load_default()
+    y = 80
+    for line in generate_page_lines(rng):
+        draw.text((80, y), line, fill=0, font=font)
+        y += 34
+    return image
+
+
+def write_report_image(path, seed=0):
+    """Write a single-page report image (png/jpg)"""
+    render_report_image(seed).save(path)
+    return path
+
+
+def write_scanned_pdf(path, pages=1, seed=0):
+    """Write an image-only PDF that forces the OCR path"""
+    images = [render_report_image(seed + i).convert('RGB') for i in range(pages)]
+    images[0].save(path, 'PDF', save_all=True, append_images=images[1:])
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic blood reports")
+    parser.add_argument('output', help="Output file (.pdf, .png, .jpg or .txt)")
+    parser.add_argument('--pages', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--scanned', action='store_true', help="Write an image-only PDF")
+    parser.add_argument('--image', action='store_true', help="Write a single page image")
+    args = parser.parse_args()
+
+    if args.image:
+        write_report_image(args.output, args.seed)
+    elif args.scanned:
+        write_scanned_pdf(args.output, args.pages, args.seed)
+    elif args.output.endswith('.txt'):
+        with open(args.output, 'w') as f:
+            f.write(generate_report_text(args.pages, args.seed))
+    else:
+        write_report_pdf(args.output, args.pages, args.seed)
+    print(f"Wrote {args.output}")
@@ -0,0 +1,88 @@
+"""
+Upload storage benchmark: flat directory vs content-addressed shards
+
+Usage (from the backend directory):
+    python benchmarks/upload_storage_benchmark.py --files 100000
+
+Writes the same small files into one flat directory (the old UPLOAD_FOLDER
+layout) and into LocalStorage, then times a directory listing, lookups of
+random files and a full batched key walk as used by the orphan sweep.
+"""
+
+import argparse
+import hashlib
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+from storage import LocalStorage, UploadStorage  # noqa: E402
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def walk_keys(backend, batch_size):
+    after = ''
+    count = 0
+    while True:
+        batch = backend.list(after=after, limit=batch_size)
+        if not batch:
+            return count
+        after = batch[-1][0]
+        count += len(batch)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Upload storage layout benchmark")
+    parser.add_argument('--files', type=int, default=100000)
+    parser.add_argument('--lookups', type=int, default=10000)
+    parser.add_argument('--batch-size', type=int, default=500)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix='upload-bench-')
+    try:
+        flat_dir = os.path.join(root, 'flat')
+        os.makedirs(flat_dir)
+        storage = UploadStorage(LocalStorage(os.path.join(root, 'sharded')))
+        payloads = [hashlib.sha256(str(i).encode()).digest() * 8 for i in range(args.files)]
+
+        def write_flat():
+            for i, data in enumerate(payloads):
+                with open(os.path.join(flat_dir, f"report_{i}.pdf"), 'wb') as f:
+                    f.write(data)
+
+        flat_write, _ = timed(write_flat)
+        sharded_write, keys = timed(lambda: [storage.save(data, 'report.pdf') for data in payloads])
+        dedupe, _ = timed(lambda: [storage.save(data, 'report.pdf') for data in payloads[:args.lookups]])
+
+        rng = random.Random(0)
+        picks = [rng.randrange(args.files) for _ in range(args.lookups)]
+        flat_lookup, _ = timed(lambda: [os.path.exists(os.path.join(flat_dir, f"report_{i}.pdf")) for i in picks])
+        sharded_lookup, _ = timed(lambda: [storage.backend.exists(keys[i]) for i in picks])
+        flat_list, _ = timed(lambda: os.listdir(flat_dir))
+        walk, walked = timed(lambda: walk_keys(storage.backend, args.batch_size))
+
+        print(f"{args.files} files, {args.lookups} lookups")
+        print(f"{'write flat':<28} {flat_write:8.3f} s")
+        print(f"{'write sharded (hash + put)':<28} {sharded_write:8.3f} s")
+        print(f"{'re-upload (dedupe)':<28} {dedupe:8.3f} s  ({args.lookups} files)")
+        print(f"{'lookup flat':<28} {flat_lookup * 1e6 / args.lookups:8.1f} us")
+        print(f"{'lookup sharded':<28} {sharded_lookup * 1e6 / args.lookups:8.1f} us")
+        print(f"{'list flat directory':<28} {flat_list:8.3f} s")
+        print(f"{'batched key walk':<28} {walk:8.3f} s  ({walked} keys, batches of {args.batch_size})")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
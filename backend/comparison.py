@@ -0,0 +1,142 @@
+"""
+Report comparison and delta analysis
+Values are aligned on parameter code into NumPy arrays, so deltas, percent
+changes and status crossings for all parameters are computed in one pass
+"""
+
+import numpy as np
+from sqlalchemy import func
+
+from models import db, BloodReport, BloodValue
+from value_codec import PARAMETERS, UNITS, STATUSES, STATUS_CODES
+
+PARAMETER_COUNT = len(PARAMETERS)
+
+
+def _empty_side():
+    return {
+        'value': np.full(PARAMETER_COUNT, np.nan),
+        'status': np.full(PARAMETER_COUNT, -1, dtype=np.int8),
+        'unit': np.zeros(PARAMETER_COUNT, dtype=np.int16),
+        'report': np.zeros(PARAMETER_COUNT, dtype=np.int64)
+    }
+
+
+def _fill(side, rows):
+    """Scatter (parameter_code, unit_code, value, status, report_id) rows into a side"""
+    if not rows:
+        return side
+    codes = np.fromiter((row[0] for row in rows), dtype=np.intp, count=len(rows))
+    side['unit'][codes] = [row[1] for row in rows]
+    side['value'][codes] = [row[2] for row in rows]
+    side['status'][codes] = [STATUS_CODES[row[3]] for row in rows]
+    side['report'][codes] = [row[4] for row in rows]
+    return side
+
+
+def latest_value_pairs(user_id):
+    """Load the two most recent values of every parameter with one windowed query"""
+    rank = func.row_number().over(
+        partition_by=BloodValue.parameter_code,
+        order_by=(BloodReport.upload_date.desc(), BloodReport.id.desc())
+    ).label('rank')
+    ranked = db.session.query(
+        BloodValue.parameter_code,
+        BloodValue.unit_code,
+        BloodValue.value,
+        BloodValue.status,
+        BloodValue.report_id,
+        rank
+    ).join(
+        BloodReport, BloodReport.id == BloodValue.report_id
+    ).filter(
+        BloodReport.user_id == user_id
+    ).subquery()
+
+    rows = db.session.query(ranked).filter(ranked.c.rank <= 2).all()
+    current = _fill(_empty_side(), [row[:5] for row in rows if row.rank == 1])
+    previous = _fill(_empty_side(), [row[:5] for row in rows if row.rank == 2])
+    return current, previous
+
+
+def report_value_pair(report_id, baseline_report_id):
+    """Load the values of two specific reports"""
+    rows = db.session.query(
+        BloodValue.parameter_code,
+        BloodValue.unit_code,
+        BloodValue.value,
+        BloodValue.status,
+        BloodValue.report_id
+    ).filter(
+        BloodValue.report_id.in_((report_id, baseline_report_id))
+    ).all()
+    current = _fill(_empty_side(), [row for row in rows if row.report_id == report_id])
+    previous = _fill(_empty_side(), [row for row in rows if row.report_id == baseline_report_id])
+    return current, previous
+
+
+def compare_values(current, previous, threshold=10.0):
+    """Compute deltas for every parameter present on both sides"""
+    both = ~np.isnan(current['value']) & ~np.isnan(previous['value'])
+    delta = current['value'] - previous['value']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        percent = np.where(previous['value'] != 0, delta / np.abs(previous['value']) * 100, np.nan)
+    crossed = both & (current['status'] != previous['status'])
+    significant = both & (np.abs(percent) >= threshold)
+    new = ~np.isnan(current['value']) & np.isnan(previous['value'])
+
+    changes = []
+    for code in np.flatnonzero(both):
+        changes.append({
+            'name': PARAMETERS[code],
+            'unit': UNITS[current['unit'][code]],
+            'previous': float(previous['value'][code]),
+            'current': float(current['value'][code]),
+            'delta': round(float(delta[code]), 4),
+            'percentChange': None if np.isnan(percent[code]) else round(float(percent[code]), 2),
+            'previousStatus': STATUSES[previous['status'][code]],
+            'status': STATUSES[current['status'][code]],
+            'crossed': bool(crossed[code]),
+            'significant': bool(significant[code]),
+            'previousReportId': int(previous['report'][code]),
+            'reportId': int(current['report'][code])
+        })
+
+    return {
+        'changes': changes,
+        'crossed': [PARAMETERS[code] for code in np.flatnonzero(crossed)],
+        'significant': [PARAMETERS[code] for code in np.flatnonzero(significant)],
+        'newParameters': [PARAMETERS[code] for code in np.flatnonzero(new)],
+        'threshold': threshold
+    }
+
+
+def previous_report_id(report):
+    """Id of the user's report uploaded just before this one, or None"""
+    row = db.session.query(BloodReport.id).filter(
+        BloodReport.user_id == report.user_id,
+        db.or_(
+            BloodReport.upload_date < report.upload_date,
+            db.and_(BloodReport.upload_date == report.upload_date, BloodReport.id < report.id)
+        )
+    ).order_by(BloodReport.upload_date.desc(), BloodReport.id.desc()).first()
+    return row.id if row else None
+
+
+def compare_with_previous(report, threshold=10.0):
+    """Compare a newly stored report with the user's previous report"""
+    baseline_id = previous_report_id(report)
+    if baseline_id is None:
+        current, _ = report_value_pair(report.id, report.id)
+        return compare_values(current, _empty_side(), threshold=threshold)
+    return compare_reports(report.id, baseline_id, threshold=threshold)
+
+
+def compare_latest(user_id, threshold=10.0):
+    """Compare each parameter's latest value with the one before it"""
+    return compare_values(*latest_value_pairs(user_id), threshold=threshold)
+
+
+def compare_reports(report_id, baseline_report_id, threshold=10.0):
+    """Compare two specific reports"""
+    return compare_values(*report_value_pair(report_id, baseline_report_id), threshold=threshold)
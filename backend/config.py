@@ -11,16 +11,28 @@ class Config:
     
     # SQLAlchemy Configuration - URL encode the password to handle special characters
     encoded_password = quote_plus(MYSQL_PASSWORD)
-    SQLALCHEMY_DATABASE_URI = f"mysql+mysqlconnector://{MYSQL_USER}:{encoded_password}@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DATABASE}"
+    # DATABASE_URL overrides MySQL, e.g. sqlite:///blood_sight.db for local runs
+    SQLALCHEMY_DATABASE_URI = os.environ.get(
+        'DATABASE_URL',
+        f"mysql+mysqlconnector://{MYSQL_USER}:{encoded_password}@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DATABASE}"
+    )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
     # Flask Configuration
     SECRET_KEY = os.environ.get('SECRET_KEY', 'your-secret-key-here')
     
     # Upload Configuration
-    UPLOAD_FOLDER = 'uploads'
+    UPLOAD_FOLDER = os.environ.get('UPLOAD_FOLDER', 'uploads')  # Root of the local storage backend
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
     
+    # Upload Storage Configuration
+    STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 'local')  # local, or memory (object-store stand-in for tests)
+    STORAGE_BUCKET = os.environ.get('STORAGE_BUCKET', 'blood-sight-uploads')  # Bucket for object-store backends
+    STORAGE_COMPRESS_IMAGES = os.environ.get('STORAGE_COMPRESS_IMAGES', 'false').lower() == 'true'  # gzip images at rest
+    STORAGE_COMPRESS_MIN_SAVING = float(os.environ.get('STORAGE_COMPRESS_MIN_SAVING', 0.05))  # Keep gzip only if it saves 5%+
+    UPLOAD_RETENTION_DAYS = int(os.environ.get('UPLOAD_RETENTION_DAYS', 0))  # Drop report files after N days, 0 keeps them
+    UPLOAD_ORPHAN_GRACE_HOURS = int(os.environ.get('UPLOAD_ORPHAN_GRACE_HOURS', 24))  # Age before unreferenced files go
+    
     # Email Configuration for OTP
     MAIL_SERVER = 'smtp.gmail.com'
     MAIL_PORT = 587
@@ -29,3 +41,13 @@ class Config:
     MAIL_USERNAME = os.environ.get('MAIL_USERNAME', '')  # Your Gmail address
     MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD', '')  # Your Gmail app password
     MAIL_DEFAULT_SENDER = os.environ.get('MAIL_DEFAULT_SENDER', MAIL_USERNAME)
+    
+    # Profiling Configuration
+    TIMING_HEADER = os.environ.get('TIMING_HEADER', 'false').lower() == 'true'  # Always send Server-Timing
+    PROFILE_EVERY_N = int(os.environ.get('PROFILE_EVERY_N', 0))  # Profile every Nth request, 0 disables
+    PROFILE_SLOW_MS = int(os.environ.get('PROFILE_SLOW_MS', 0))  # Dump profiles slower than this, 0 disables
+    PROFILE_DIR = os.environ.get('PROFILE_DIR', 'profiles')
+    
+    # Analysis Cache Configuration
+    ANALYSIS_CACHE_MAX_BYTES = int(os.environ.get('ANALYSIS_CACHE_MAX_BYTES', 64 * 1024 * 1024))  # 64MB in-process LRU
+    ANALYSIS_CACHE_PERSISTENT = os.environ.get('ANALYSIS_CACHE_PERSISTENT', 'true').lower() == 'true'  # Reuse stored results
@@ -0,0 +1,6 @@
+-- Adds the analysis cache key next to blood_reports.analysis_result
+-- Apply once to databases created before the analysis cache existed:
+--   mysql -u root -p blood_sight < migrations/001_add_analysis_key.sql
+
+ALTER TABLE blood_reports ADD COLUMN analysis_key VARCHAR(64) NULL AFTER analysis_result;
+CREATE INDEX ix_blood_reports_analysis_key ON blood_reports (analysis_key);
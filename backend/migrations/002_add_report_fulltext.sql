@@ -0,0 +1,5 @@
+-- Full-text index used by GET /reports/search on MySQL
+-- InnoDB maintains it on every insert, so uploads are searchable immediately:
+--   mysql -u root -p blood_sight < migrations/002_add_report_fulltext.sql
+
+ALTER TABLE blood_reports ADD FULLTEXT INDEX ft_blood_reports_extracted_text (extracted_text);
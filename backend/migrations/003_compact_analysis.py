@@ -0,0 +1,112 @@
+"""
+Converts stored analyses to the compact encoding in value_codec
+- blood_reports.analysis_result: JSON -> orjson summary (BLOB) + packed_values
+- blood_values: parameter_name/unit/normal_range strings -> small integer codes,
+  value string -> DOUBLE
+
+Run once from the backend directory after backing up the database:
+    python migrations/003_compact_analysis.py
+"""
+
+import os
+import sys
+
+import orjson
+from sqlalchemy import text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app  # noqa: E402
+from models import db  # noqa: E402
+from value_codec import encode_analysis, encode_value  # noqa: E402
+
+CHUNK_SIZE = 1000
+
+
+def execute(statement, params=None):
+    db.session.execute(text(statement), params or {})
+
+
+def migrate_reports():
+    """Re-encode every analysis_result into the new columns"""
+    execute("ALTER TABLE blood_reports ADD COLUMN analysis_blob BLOB NULL")
+    execute("ALTER TABLE blood_reports ADD COLUMN packed_values BLOB NULL")
+
+    last_id = 0
+    migrated = 0
+    while True:
+        rows = db.session.execute(text(
+            "SELECT id, analysis_result FROM blood_reports "
+            "WHERE id > :last_id ORDER BY id LIMIT :limit"
+        ), {'last_id': last_id, 'limit': CHUNK_SIZE}).all()
+        if not rows:
+            break
+        updates = []
+        for report_id, analysis in rows:
+            if analysis is None:
+                continue
+            if isinstance(analysis, (str, bytes)):
+                analysis = orjson.loads(analysis)
+            summary, packed = encode_analysis(analysis)
+            updates.append({'id': report_id, 'summary': summary, 'packed': packed})
+        if updates:
+            execute("UPDATE blood_reports SET analysis_blob = :summary, packed_values = :packed "
+                    "WHERE id = :id", updates)
+        db.session.commit()
+        last_id = rows[-1][0]
+        migrated += len(updates)
+        print(f"blood_reports: {migrated} analyses encoded")
+
+    execute("ALTER TABLE blood_reports DROP COLUMN analysis_result")
+    execute("ALTER TABLE blood_reports RENAME COLUMN analysis_blob TO analysis_result")
+    execute("CREATE INDEX ix_blood_reports_user_upload ON blood_reports (user_id, upload_date)")
+    db.session.commit()
+
+
+def migrate_values():
+    """Dictionary-encode the string columns of blood_values"""
+    for column in ('parameter_code', 'unit_code', 'range_code'):
+        execute(f"ALTER TABLE blood_values ADD COLUMN {column} SMALLINT NULL")
+    execute("ALTER TABLE blood_values ADD COLUMN value_num DOUBLE NULL")
+
+    last_id = 0
+    migrated = 0
+    while True:
+        rows = db.session.execute(text(
+            "SELECT id, parameter_name, value, unit, normal_range, status FROM blood_values "
+            "WHERE id > :last_id ORDER BY id LIMIT :limit"
+        ), {'last_id': last_id, 'limit': CHUNK_SIZE}).all()
+        if not rows:
+            break
+        updates = []
+        for row in rows:
+            parameter_code, unit_code, range_code, _, value = encode_value({
+                'name': row.parameter_name, 'value': row.value, 'unit': row.unit,
+                'normalRange': row.normal_range, 'status': row.status
+            })
+            updates.append({
+                'id': row.id, 'parameter_code': parameter_code, 'unit_code': unit_code,
+                'range_code': range_code, 'value': value
+            })
+        execute("UPDATE blood_values SET parameter_code = :parameter_code, unit_code = :unit_code, "
+                "range_code = :range_code, value_num = :value WHERE id = :id", updates)
+        db.session.commit()
+        last_id = rows[-1].id
+        migrated += len(updates)
+        print(f"blood_values: {migrated} rows encoded")
+
+    for column in ('parameter_name', 'value', 'unit', 'normal_range'):
+        execute(f"ALTER TABLE blood_values DROP COLUMN {column}")
+    execute("ALTER TABLE blood_values RENAME COLUMN value_num TO value")
+    if db.engine.dialect.name == 'mysql':
+        execute("ALTER TABLE blood_values MODIFY parameter_code SMALLINT NOT NULL, "
+                "MODIFY unit_code SMALLINT NOT NULL, MODIFY range_code SMALLINT NOT NULL, "
+                "MODIFY value DOUBLE NOT NULL")
+    db.session.commit()
+
+
+if __name__ == "__main__":
+    with app.app_context():
+        migrate_reports()
+        migrate_values()
+        print("Compact analysis migration completed")
@@ -0,0 +1,4 @@
+-- Supports the per-parameter windowed query behind POST /reports/compare
+--   mysql -u root -p blood_sight < migrations/004_add_value_comparison_index.sql
+
+CREATE INDEX ix_blood_values_report_parameter ON blood_values (report_id, parameter_code);
@@ -0,0 +1,109 @@
+"""
+Moves stored reports onto content-addressed upload storage
+- blood_reports.file_path: flat uploads/<filename> path -> storage key
+  (NULL when the file is gone or was overwritten by a later upload of the same name)
+- blood_reports.file_path becomes nullable and indexed for the retention sweep
+
+Legacy files are copied, not moved; remove the flat files from UPLOAD_FOLDER
+once the migration has been checked. Overwrites are detected from file
+modification times, so run it against the original folder, not a copy that
+reset them.
+
+Run once from the backend directory after backing up the database:
+    python migrations/005_content_addressed_uploads.py
+"""
+
+import os
+import sys
+from datetime import datetime
+
+from sqlalchemy import text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, storage  # noqa: E402
+from models import db  # noqa: E402
+from storage import is_storage_key  # noqa: E402
+
+CHUNK_SIZE = 1000
+
+
+def execute(statement, params=None):
+    db.session.execute(text(statement), params or {})
+
+
+def alter_schema():
+    """Return whether file_path can now hold NULL"""
+    nullable = db.engine.dialect.name == 'mysql'
+    if nullable:
+        execute("ALTER TABLE blood_reports MODIFY file_path VARCHAR(500) NULL")
+    else:
+        print("Only MySQL can relax NOT NULL in place; reports with missing or overwritten files keep their old path "
+              "and cleanup-uploads will refuse --retention-days until the table is recreated")
+    execute("CREATE INDEX ix_blood_reports_file_path ON blood_reports (file_path)")
+    db.session.commit()
+    return nullable
+
+
+def written_after(file_path, upload_date):
+    """Whether the file was rewritten after its report was stored; legacy uploads saved it first"""
+    try:
+        modified = datetime.utcfromtimestamp(os.stat(file_path).st_mtime)
+    except FileNotFoundError:
+        return False
+    if isinstance(upload_date, str):  # SQLite hands back the stored text
+        upload_date = datetime.fromisoformat(upload_date)
+    return modified > upload_date
+
+
+def migrate_paths(nullable):
+    """Store each legacy file and point its report at the new key
+
+    Uploads of the same name shared one flat path, so only the newest report on
+    a path can still own the file there, and only if no anonymous upload
+    replaced it afterwards. Older reports are treated like missing files rather
+    than linked to another upload's content.
+    """
+    last_id = 0
+    stored = 0
+    missing = 0
+    overwritten = 0
+    while True:
+        rows = db.session.execute(text(
+            "SELECT r.id, r.filename, r.file_path, r.upload_date, EXISTS ("
+            "  SELECT 1 FROM blood_reports newer WHERE newer.file_path = r.file_path AND ("
+            "    newer.upload_date > r.upload_date"
+            "    OR (newer.upload_date = r.upload_date AND newer.id > r.id))"
+            ") AS superseded FROM blood_reports r "
+            "WHERE r.id > :last_id AND r.file_path IS NOT NULL ORDER BY r.id LIMIT :limit"
+        ), {'last_id': last_id, 'limit': CHUNK_SIZE}).all()
+        if not rows:
+            break
+        updates = []
+        for report_id, filename, file_path, upload_date, superseded in rows:
+            if is_storage_key(file_path):
+                continue
+            key = None
+            if superseded or written_after(file_path, upload_date):
+                overwritten += 1
+            else:
+                try:
+                    with open(file_path, 'rb') as f:
+                        key = storage.save(f.read(), filename)
+                    stored += 1
+                except FileNotFoundError:
+                    missing += 1
+            if key is None and not nullable:
+                continue
+            updates.append({'id': report_id, 'key': key})
+        if updates:
+            execute("UPDATE blood_reports SET file_path = :key WHERE id = :id", updates)
+        db.session.commit()
+        last_id = rows[-1][0]
+        print(f"blood_reports: {stored} files stored, {missing} missing, {overwritten} overwritten")
+
+
+if __name__ == "__main__":
+    with app.app_context():
+        migrate_paths(alter_schema())
+        print("Content-addressed upload migration completed")
@@ -0,0 +1,6 @@
+-- Drops the single-column user_id index added by earlier versions of migration 002.
+-- ix_blood_reports_user_upload (user_id, upload_date) serves the same lookups and
+-- the user_id foreign key. Skip this on databases that never had the index:
+--   mysql -u root -p blood_sight < migrations/006_drop_report_user_index.sql
+
+DROP INDEX ix_blood_reports_user_id ON blood_reports;
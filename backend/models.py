@@ -1,6 +1,9 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
 from werkzeug.security import generate_password_hash, check_password_hash
+from value_codec import (
+    PARAMETERS, UNITS, NORMAL_RANGES, encode_value, encode_analysis, decode_analysis
+)
 
 db = SQLAlchemy()
 
@@ -29,31 +32,48 @@ class User(db.Model):
         return check_password_hash(self.password_hash, password)
     
     def to_dict(self):
-        """Convert user object to dictionary"""
+        """Convert user object to dictionary; dates are encoded by the JSON provider"""
         return {
             'id': self.id,
             'name': self.name,
             'email': self.email,
             'phone': self.phone,
-            'date_of_birth': self.date_of_birth.isoformat() if self.date_of_birth else None,
+            'date_of_birth': self.date_of_birth,
             'gender': self.gender,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat()
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
         }
 
 class BloodReport(db.Model):
     __tablename__ = 'blood_reports'
+    __table_args__ = (
+        # Backs GET /reports (newest first per user); migration 003 adds it to existing databases
+        db.Index('ix_blood_reports_user_upload', 'user_id', 'upload_date'),
+        # Backs GET /reports/search on MySQL; SQLite searches its FTS5 table instead
+        db.Index('ft_blood_reports_extracted_text', 'extracted_text', mysql_prefix='FULLTEXT').ddl_if(dialect='mysql'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     filename = db.Column(db.String(255), nullable=False)
     original_filename = db.Column(db.String(255), nullable=False)
-    file_path = db.Column(db.String(500), nullable=False)
+    file_path = db.Column(db.String(500), nullable=True, index=True)  # Storage key, cleared when the file expires
     extracted_text = db.Column(db.Text, nullable=True)
-    analysis_result = db.Column(db.JSON, nullable=True)
+    analysis_result = db.Column(db.LargeBinary, nullable=True)  # orjson summary, values live in packed_values
+    packed_values = db.Column(db.LargeBinary, nullable=True)  # Dictionary-encoded blood values, see value_codec
+    analysis_key = db.Column(db.String(64), nullable=True, index=True)  # Hash of normalized text + rules version
     upload_date = db.Column(db.DateTime, default=datetime.utcnow)
     analysis_date = db.Column(db.DateTime, nullable=True)
     
+    @property
+    def analysis(self):
+        """Decoded analysis in the shape returned by analyze_blood_report"""
+        return decode_analysis(self.analysis_result, self.packed_values)
+    
+    @analysis.setter
+    def analysis(self, analysis):
+        self.analysis_result, self.packed_values = encode_analysis(analysis)
+    
     def to_dict(self):
         """Convert blood report object to dictionary"""
         return {
@@ -62,35 +82,66 @@ class BloodReport(db.Model):
             'filename': self.filename,
             'original_filename': self.original_filename,
             'extracted_text': self.extracted_text,
-            'analysis_result': self.analysis_result,
-            'upload_date': self.upload_date.isoformat(),
-            'analysis_date': self.analysis_date.isoformat() if self.analysis_date else None
+            'analysis_result': self.analysis,
+            'upload_date': self.upload_date,
+            'analysis_date': self.analysis_date
         }
 
 class BloodValue(db.Model):
     __tablename__ = 'blood_values'
+    __table_args__ = (
+        db.Index('ix_blood_values_report_parameter', 'report_id', 'parameter_code'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     report_id = db.Column(db.Integer, db.ForeignKey('blood_reports.id'), nullable=False)
-    parameter_name = db.Column(db.String(100), nullable=False)
-    value = db.Column(db.String(50), nullable=False)
-    unit = db.Column(db.String(20), nullable=False)
-    normal_range = db.Column(db.String(50), nullable=False)
+    parameter_code = db.Column(db.SmallInteger, nullable=False)  # Index into value_codec.PARAMETERS
+    unit_code = db.Column(db.SmallInteger, nullable=False)  # Index into value_codec.UNITS
+    range_code = db.Column(db.SmallInteger, nullable=False)  # Index into value_codec.NORMAL_RANGES
+    value = db.Column(db.Float, nullable=False)
     status = db.Column(db.Enum('normal', 'high', 'low'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    @property
+    def parameter_name(self):
+        return PARAMETERS[self.parameter_code]
+    
+    @property
+    def unit(self):
+        return UNITS[self.unit_code]
+    
+    @property
+    def normal_range(self):
+        return NORMAL_RANGES[self.range_code]
+    
     def to_dict(self):
         """Convert blood value object to dictionary"""
         return {
             'id': self.id,
             'report_id': self.report_id,
             'parameter_name': self.parameter_name,
-            'value': self.value,
+            'value': str(self.value),
             'unit': self.unit,
             'normal_range': self.normal_range,
             'status': self.status,
-            'created_at': self.created_at.isoformat()
+            'created_at': self.created_at
         }
+    
+    @classmethod
+    def from_analysis(cls, report_id, analysis):
+        """Build blood value rows from an analyze_blood_report result"""
+        rows = []
+        for blood_value in analysis['bloodValues']:
+            parameter_code, unit_code, range_code, _, value = encode_value(blood_value)
+            rows.append(cls(
+                report_id=report_id,
+                parameter_code=parameter_code,
+                unit_code=unit_code,
+                range_code=range_code,
+                value=value,
+                status=blood_value['status']
+            ))
+        return rows
 
 class PasswordResetToken(db.Model):
     __tablename__ = 'password_reset_tokens'
@@ -114,6 +165,6 @@ class PasswordResetToken(db.Model):
             'user_id': self.user_id,
             'email': self.email,
             'is_used': self.is_used,
-            'created_at': self.created_at.isoformat(),
-            'expires_at': self.expires_at.isoformat()
+            'created_at': self.created_at,
+            'expires_at': self.expires_at
         }
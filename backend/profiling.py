@@ -0,0 +1,130 @@
+"""
+Request profiling and stage timing for the Blood-Sight backend
+Stage timers feed Prometheus histograms, an optional Server-Timing header
+and a sampling cProfile hook that is idle unless configured
+"""
+
+import cProfile
+import itertools
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from flask import g, has_request_context, request
+from prometheus_client import Histogram
+
+# Buckets cover fast text extraction through multi-page OCR runs
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+STAGE_SECONDS = Histogram(
+    'bloodsight_stage_seconds',
+    'Time spent in each stage of the upload pipeline',
+    ['stage'],
+    buckets=STAGE_BUCKETS
+)
+
+REQUEST_SECONDS = Histogram(
+    'bloodsight_request_seconds',
+    'Total request latency per endpoint',
+    ['endpoint', 'method', 'status'],
+    buckets=STAGE_BUCKETS
+)
+
+_request_counter = itertools.count(1)
+
+
+@contextmanager
+def stage_timer(stage):
+    """Time a pipeline stage and record it for metrics and the timing header"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.labels(stage=stage).observe(elapsed)
+        if has_request_context() and 'stage_timings' in g:
+            g.stage_timings.append((stage, elapsed))
+
+
+def _dump_profile(config, profiler, endpoint, elapsed_ms):
+    """Write a .prof file that snakeviz or flameprof can turn into a flamegraph"""
+    profile_dir = config['PROFILE_DIR']
+    os.makedirs(profile_dir, exist_ok=True)
+    timestamp = datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')
+    path = os.path.join(profile_dir, f"{timestamp}_{endpoint}_{elapsed_ms:.0f}ms.prof")
+    profiler.dump_stats(path)
+    return path
+
+
+def _server_timing(timings, total):
+    """Format stage timings as a Server-Timing header value"""
+    entries = [f"{stage};dur={elapsed * 1000:.1f}" for stage, elapsed in timings]
+    entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
+
+
+def init_profiling(app):
+    """Register the timing and sampling hooks on the Flask app"""
+
+    @app.before_request
+    def start_request_timer():
+        g.request_start = time.perf_counter()
+        g.stage_timings = []
+        g.profiler = None
+        g.profile_every_n = False
+
+        if not (app.config['PROFILE_EVERY_N'] or app.config['PROFILE_SLOW_MS']):
+            return
+
+        every_n = app.config['PROFILE_EVERY_N']
+        g.profile_every_n = bool(every_n) and next(_request_counter) % every_n == 0
+        if g.profile_every_n or app.config['PROFILE_SLOW_MS']:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Another request thread already holds the profiler
+                return
+            g.profiler = profiler
+
+    @app.after_request
+    def record_request_timing(response):
+        if 'request_start' not in g:
+            return response
+
+        start = g.request_start
+        profiler = g.profiler
+        profile_every_n = g.profile_every_n
+        endpoint = request.endpoint or 'unknown'
+        method = request.method
+        status = response.status_code
+
+        def finish():
+            total = time.perf_counter() - start
+            elapsed_ms = total * 1000
+
+            if profiler is not None:
+                profiler.disable()
+                slow_ms = app.config['PROFILE_SLOW_MS']
+                if profile_every_n or (slow_ms and elapsed_ms >= slow_ms):
+                    try:
+                        _dump_profile(app.config, profiler, endpoint, elapsed_ms)
+                    except OSError as e:
+                        print(f"Failed to write profile: {e}")
+
+            REQUEST_SECONDS.labels(endpoint=endpoint, method=method, status=status).observe(total)
+            return total
+
+        # A streamed body is produced after this hook returns; measure it once the server closes it
+        if response.is_streamed:
+            response.call_on_close(finish)
+            total = time.perf_counter() - start
+        else:
+            total = finish()
+
+        if app.config['TIMING_HEADER'] or request.headers.get('X-Timing'):
+            response.headers['Server-Timing'] = _server_timing(g.stage_timings, total)
+            response.headers['X-Timing'] = f"{total * 1000:.1f}ms"
+
+        return response
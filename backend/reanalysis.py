@@ -0,0 +1,134 @@
+"""
+Bulk re-analysis of stored blood reports
+Reports whose analysis key already matches their text and the current rules
+are skipped; the rest are analyzed in parallel, one chunk at a time
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from sqlalchemy import update
+
+from analysis import analyze_blood_report
+from analysis_cache import analysis_cache, cache_key, normalize_text
+from models import db, BloodReport, BloodValue
+from value_codec import encode_analysis
+from rule_engine import rule_set
+
+
+def _pending_chunk(rows):
+    """Group the changed reports of a chunk by analysis key"""
+    pending = {}
+    skipped = 0
+    for report_id, text, stored_key in rows:
+        normalized = normalize_text(text)
+        key = cache_key(normalized)
+        if key == stored_key:
+            skipped += 1
+            continue
+        pending.setdefault(key, (normalized, []))[1].append(report_id)
+    return pending, skipped
+
+
+def _analyze_chunk(executor, workers, pending):
+    """Return key -> analysis, serving repeats from the cache and farming out the rest"""
+    results = {}
+    to_compute = []
+    for key in pending:
+        analysis = analysis_cache.get(key)
+        if analysis is not None:
+            results[key] = analysis
+        else:
+            to_compute.append(key)
+
+    if to_compute:
+        texts = [pending[key][0] for key in to_compute]
+        chunksize = max(1, len(texts) // (workers * 4))
+        for key, analysis in zip(to_compute, executor.map(analyze_blood_report, texts, chunksize=chunksize)):
+            analysis_cache.put(key, analysis)
+            results[key] = analysis
+    return results
+
+
+def reanalyze_reports(chunk_size=500, workers=None):
+    """Re-run analysis over every stored report whose text or rules changed"""
+    workers = workers or os.cpu_count() or 1
+    stats = {'scanned': 0, 'skipped': 0, 'reanalyzed': 0}
+    last_id = 0
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while True:
+            # Keyset pagination keeps each chunk query cheap on large tables
+            rows = db.session.query(
+                BloodReport.id, BloodReport.extracted_text, BloodReport.analysis_key
+            ).filter(
+                BloodReport.id > last_id,
+                BloodReport.extracted_text.isnot(None)
+            ).order_by(BloodReport.id).limit(chunk_size).all()
+            if not rows:
+                break
+
+            last_id = rows[-1].id
+            stats['scanned'] += len(rows)
+            pending, skipped = _pending_chunk(rows)
+            stats['skipped'] += skipped
+            if not pending:
+                continue
+
+            results = _analyze_chunk(executor, workers, pending)
+            now = datetime.utcnow()
+            updates = []
+            values = []
+            for key, (_, report_ids) in pending.items():
+                summary, packed = encode_analysis(results[key])
+                for report_id in report_ids:
+                    updates.append({
+                        'id': report_id,
+                        'analysis_result': summary,
+                        'packed_values': packed,
+                        'analysis_key': key,
+                        'analysis_date': now
+                    })
+                    values.extend(BloodValue.from_analysis(report_id, results[key]))
+
+            try:
+                db.session.execute(update(BloodReport), updates)
+                BloodValue.query.filter(
+                    BloodValue.report_id.in_([row['id'] for row in updates])
+                ).delete(synchronize_session=False)
+                db.session.add_all(values)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+
+            stats['reanalyzed'] += len(updates)
+            print(f"Reanalyzed {stats['reanalyzed']} reports "
+                  f"({stats['skipped']} unchanged, up to id {last_id})")
+
+    return stats
+
+
+def score_stored_reports(chunk_size=50000):
+    """Re-score stored reports against the disease-pattern rules, returning fire counts per rule"""
+    counts = {rule['id']: 0 for rule in rule_set.rules}
+    scored = 0
+    last_id = 0
+
+    while True:
+        rows = db.session.query(BloodReport.id, BloodReport.packed_values).filter(
+            BloodReport.id > last_id,
+            BloodReport.packed_values.isnot(None)
+        ).order_by(BloodReport.id).limit(chunk_size).all()
+        if not rows:
+            break
+
+        fired = rule_set.score_packed([row.packed_values for row in rows])
+        for rule, hits in zip(rule_set.rules, fired.sum(axis=0)):
+            counts[rule['id']] += int(hits)
+
+        scored += len(rows)
+        last_id = rows[-1].id
+
+    return scored, counts
@@ -0,0 +1,96 @@
+"""
+Retention of uploaded files
+Expired reports keep their text and analysis but drop their file reference;
+stored objects that no report references are deleted once they are older
+than the orphan grace period. Both passes walk keys in batches, so a cleanup
+over millions of files never holds more than one batch in memory
+"""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import inspect, update
+
+from models import db, BloodReport
+
+
+def file_path_nullable():
+    """Whether blood_reports.file_path accepts NULL (migration 005 cannot change this on SQLite)"""
+    columns = inspect(db.engine).get_columns(BloodReport.__tablename__)
+    return next(column['nullable'] for column in columns if column['name'] == 'file_path')
+
+
+def expire_report_files(cutoff, batch_size=500, dry_run=False):
+    """Clear file_path on reports uploaded before cutoff"""
+    last_id = 0
+    expired = 0
+    while True:
+        ids = [row.id for row in db.session.query(BloodReport.id).filter(
+            BloodReport.id > last_id,
+            BloodReport.upload_date < cutoff,
+            BloodReport.file_path.isnot(None)
+        ).order_by(BloodReport.id).limit(batch_size)]
+        if not ids:
+            break
+        if not dry_run:
+            db.session.execute(
+                update(BloodReport).where(BloodReport.id.in_(ids)).values(file_path=None)
+            )
+            db.session.commit()
+        last_id = ids[-1]
+        expired += len(ids)
+    return expired
+
+
+def sweep_orphans(storage, grace_hours, batch_size=500, dry_run=False, expired_before=None):
+    """Delete stored objects no report references that were last written before the grace period
+
+    The grace period covers uploads still being processed and anonymous
+    uploads, which are never attached to a report. References from reports
+    uploaded before expired_before are ignored, so a dry run counts what the
+    retention pass would free.
+    """
+    cutoff = datetime.utcnow() - timedelta(hours=grace_hours)
+    after = ''
+    scanned = 0
+    deleted = 0
+    while True:
+        batch = storage.backend.list(after=after, limit=batch_size)
+        if not batch:
+            break
+        after = batch[-1][0]
+        scanned += len(batch)
+
+        candidates = [key for key, modified in batch if modified < cutoff]
+        if not candidates:
+            continue
+        query = db.session.query(BloodReport.file_path).filter(BloodReport.file_path.in_(candidates))
+        if expired_before is not None:
+            query = query.filter(BloodReport.upload_date >= expired_before)
+        referenced = {row.file_path for row in query}
+        for key in candidates:
+            if key in referenced:
+                continue
+            # Identical content uploaded since the listing refreshed the key; keep it
+            modified = storage.backend.modified(key)
+            if modified is None or modified >= cutoff:
+                continue
+            if not dry_run:
+                storage.delete(key)
+            deleted += 1
+    return scanned, deleted
+
+
+def cleanup_uploads(storage, retention_days, grace_hours, batch_size=500, dry_run=False):
+    """Apply the retention policy, then delete unreferenced objects"""
+    expired = 0
+    expired_before = None
+    if retention_days:
+        if not file_path_nullable():
+            raise RuntimeError(
+                "blood_reports.file_path is NOT NULL, so report files cannot expire; "
+                "recreate the table from the current model or run without retention"
+            )
+        expired_before = datetime.utcnow() - timedelta(days=retention_days)
+        expired = expire_report_files(expired_before, batch_size, dry_run)
+    scanned, deleted = sweep_orphans(storage, grace_hours, batch_size, dry_run, expired_before)
+    return {'expired': expired, 'scanned': scanned, 'deleted': deleted}
@@ -0,0 +1,155 @@
+"""
+Declarative disease-pattern rules compiled to a vectorized evaluator
+Rules from rules/disease_patterns.yaml become NumPy mask functions over a
+(reports x parameters) value matrix and a matching status matrix, so one
+report and a batch of millions are scored by the same code
+"""
+
+import hashlib
+import os
+from functools import reduce
+
+import numpy as np
+import yaml
+
+from value_codec import PARAMETERS, STATUS_CODES, PACK_VERSION
+
+RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rules', 'disease_patterns.yaml')
+
+PARAMETER_INDEX = {name.lower(): code for code, name in enumerate(PARAMETERS)}
+SEVERITIES = ('low', 'medium', 'high')
+
+_COMPARISONS = {
+    'lt': np.less,
+    'le': np.less_equal,
+    'gt': np.greater,
+    'ge': np.greater_equal
+}
+
+# Matches the records written by value_codec.pack_values
+PACKED_DTYPE = np.dtype([
+    ('parameter', 'u1'), ('unit', 'u1'), ('range', 'u1'), ('status', 'u1'), ('value', '<f8')
+])
+
+
+class RuleError(ValueError):
+    """Raised when the rules file is malformed"""
+
+
+def _compile(condition, rule_id):
+    """Turn one condition into a function (values, statuses) -> boolean mask"""
+    if 'all' in condition and 'any' in condition:
+        raise RuleError(f"Rule '{rule_id}' mixes all and any in one condition; nest one inside the other")
+    if 'all' in condition or 'any' in condition:
+        combine = np.logical_and if 'all' in condition else np.logical_or
+        parts = [_compile(part, rule_id) for part in condition.get('all' if 'all' in condition else 'any') or []]
+        if not parts:
+            raise RuleError(f"Rule '{rule_id}' has an empty all/any list")
+        return lambda values, statuses: reduce(combine, (part(values, statuses) for part in parts))
+
+    name = str(condition.get('parameter', '')).lower()
+    if name not in PARAMETER_INDEX:
+        raise RuleError(f"Rule '{rule_id}' refers to unknown parameter '{name}'")
+    code = PARAMETER_INDEX[name]
+
+    if 'status' in condition:
+        wanted = condition['status']
+        wanted = [wanted] if isinstance(wanted, str) else wanted
+        try:
+            codes = [STATUS_CODES[status] for status in wanted]
+        except KeyError as e:
+            raise RuleError(f"Rule '{rule_id}' uses unknown status {e}") from None
+        # A chain of equality tests beats np.isin for the two or three codes involved
+        return lambda values, statuses: reduce(
+            np.logical_or, (statuses[:, code] == status for status in codes)
+        )
+
+    for op, compare in _COMPARISONS.items():
+        if op in condition:
+            threshold = float(condition[op])
+            # NaN marks a missing value and compares False
+            return lambda values, statuses: compare(values[:, code], threshold)
+
+    raise RuleError(f"Rule '{rule_id}' has a condition without status or comparison")
+
+
+class RuleSet:
+    """Compiled rules plus helpers to build the matrices they evaluate"""
+
+    def __init__(self, rules, digest):
+        self.rules = []
+        self._masks = []
+        for rule in rules:
+            severity = rule.get('severity', 'medium')
+            if severity not in SEVERITIES:
+                raise RuleError(f"Rule '{rule['id']}' has unknown severity '{severity}'")
+            self._masks.append(_compile(rule['when'], rule['id']))
+            self.rules.append({
+                'id': rule['id'],
+                'name': rule['name'],
+                'severity': severity,
+                'recommendation': rule.get('recommendation')
+            })
+        self.digest = digest
+
+    def evaluate(self, values, statuses):
+        """Return a (reports x rules) boolean matrix of fired rules"""
+        fired = np.zeros((values.shape[0], len(self._masks)), dtype=bool)
+        for index, mask in enumerate(self._masks):
+            fired[:, index] = mask(values, statuses)
+        return fired
+
+    @staticmethod
+    def empty_matrices(count):
+        values = np.full((count, len(PARAMETERS)), np.nan)
+        statuses = np.full((count, len(PARAMETERS)), -1, dtype=np.int8)
+        return values, statuses
+
+    def score(self, blood_values):
+        """Return the rules fired by one report's API blood values"""
+        values, statuses = self.empty_matrices(1)
+        for blood_value in blood_values:
+            code = PARAMETER_INDEX[blood_value['name'].lower()]
+            values[0, code] = float(blood_value['value'])
+            statuses[0, code] = STATUS_CODES[blood_value['status']]
+        fired = self.evaluate(values, statuses)[0]
+        return [rule for rule, hit in zip(self.rules, fired) if hit]
+
+    def matrices_from_packed(self, blobs):
+        """Scatter a batch of value_codec blobs into value and status matrices"""
+        blobs = [blob or bytes([PACK_VERSION]) for blob in blobs]
+        lengths = np.fromiter(map(len, blobs), dtype=np.intp, count=len(blobs))
+        starts = np.cumsum(lengths) - lengths
+        joined = np.frombuffer(b''.join(blobs), dtype=np.uint8)
+        if np.any(joined[starts] != PACK_VERSION):
+            raise ValueError("Unsupported packed values version")
+
+        # Drop each blob's version byte so the records line up back to back
+        keep = np.ones(joined.size, dtype=bool)
+        keep[starts] = False
+        records = joined[keep].view(PACKED_DTYPE)
+        rows = np.repeat(np.arange(len(blobs)), (lengths - 1) // PACKED_DTYPE.itemsize)
+
+        values, statuses = self.empty_matrices(len(blobs))
+        values[rows, records['parameter']] = records['value']
+        statuses[rows, records['parameter']] = records['status']
+        return values, statuses
+
+    def score_packed(self, blobs):
+        """Return the (reports x rules) fired matrix for a batch of packed blobs"""
+        return self.evaluate(*self.matrices_from_packed(blobs))
+
+
+def load_rules(path=RULES_PATH):
+    """Load and compile the rules file"""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    document = yaml.safe_load(raw) or {}
+    rules = document.get('rules') or []
+    ids = [rule.get('id') for rule in rules]
+    if None in ids or len(set(ids)) != len(ids):
+        raise RuleError("Every rule needs a unique id")
+    return RuleSet(rules, hashlib.sha256(raw).hexdigest())
+
+
+rule_set = load_rules()
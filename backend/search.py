@@ -0,0 +1,177 @@
+"""
+Full-text search over extracted report text
+MySQL uses a FULLTEXT index on blood_reports.extracted_text (declared on
+BloodReport, migrations/002_add_report_fulltext.sql for older databases);
+SQLite keeps an FTS5 table that is updated as reports are saved
+"""
+
+import html
+import re
+
+from sqlalchemy import text
+
+from models import db, BloodReport
+
+FTS_TABLE = 'blood_reports_fts'
+
+# Private-use markers survive html.escape so highlights can be added afterwards
+_MARK_START = '\ue000'
+_MARK_END = '\ue001'
+
+_query_token = re.compile(r'"([^"]*)"|(\S+)')
+_word = re.compile(r'\w+')
+
+
+def _dialect():
+    return db.engine.dialect.name
+
+
+def parse_query(query):
+    """Split a query into phrases: quoted text stays together, other words stand alone"""
+    phrases = []
+    for quoted, bare in _query_token.findall(query):
+        words = _word.findall(quoted or bare)
+        if words:
+            phrases.append(' '.join(words))
+    return phrases
+
+
+def _fts5_expression(user_id, phrases):
+    """Build an FTS5 MATCH expression scoped to the user's owner token"""
+    terms = ' AND '.join(f'"{phrase}"' for phrase in phrases)
+    return f'owner : u{user_id} AND extracted_text : ({terms})'
+
+
+def _mysql_expression(phrases):
+    """Build a boolean-mode expression requiring every phrase"""
+    return ' '.join(f'+"{phrase}"' if ' ' in phrase else f'+{phrase}' for phrase in phrases)
+
+
+def init_search_index():
+    """Create the SQLite FTS5 table; MySQL relies on its FULLTEXT index"""
+    if _dialect() != 'sqlite':
+        return
+    db.session.execute(text(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+        f"USING fts5(owner, extracted_text, tokenize='unicode61')"
+    ))
+    db.session.commit()
+
+
+def index_report(report_id, user_id, extracted_text):
+    """Add or replace one report in the index, inside the caller's transaction"""
+    if _dialect() != 'sqlite':
+        return
+    db.session.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :id"), {'id': report_id})
+    db.session.execute(
+        text(f"INSERT INTO {FTS_TABLE} (rowid, owner, extracted_text) VALUES (:id, :owner, :text)"),
+        {'id': report_id, 'owner': f"u{user_id}", 'text': extracted_text or ''}
+    )
+
+
+def rebuild_search_index(chunk_size=1000):
+    """Re-index every stored report, for backfills and recovery"""
+    if _dialect() != 'sqlite':
+        return 0
+    init_search_index()
+    db.session.execute(text(f"DELETE FROM {FTS_TABLE}"))
+    indexed = 0
+    last_id = 0
+    while True:
+        rows = db.session.query(
+            BloodReport.id, BloodReport.user_id, BloodReport.extracted_text
+        ).filter(BloodReport.id > last_id).order_by(BloodReport.id).limit(chunk_size).all()
+        if not rows:
+            break
+        db.session.execute(
+            text(f"INSERT INTO {FTS_TABLE} (rowid, owner, extracted_text) VALUES (:id, :owner, :text)"),
+            [{'id': row.id, 'owner': f"u{row.user_id}", 'text': row.extracted_text or ''} for row in rows]
+        )
+        indexed += len(rows)
+        last_id = rows[-1].id
+    db.session.commit()
+    return indexed
+
+
+def highlight(extracted_text, phrases, width=80):
+    """Return an HTML-escaped excerpt around the first match with <mark> tags"""
+    if not extracted_text:
+        return ''
+    pattern = re.compile('|'.join(
+        r'\W+'.join(map(re.escape, phrase.split())) for phrase in phrases
+    ), re.IGNORECASE)
+    first = pattern.search(extracted_text)
+    if not first:
+        return html.escape(extracted_text[:width * 2])
+    start = max(first.start() - width, 0)
+    end = min(first.end() + width, len(extracted_text))
+    excerpt = pattern.sub(lambda m: f"{_MARK_START}{m.group(0)}{_MARK_END}", extracted_text[start:end])
+    return _render_marks(('…' if start else '') + excerpt + ('…' if end < len(extracted_text) else ''))
+
+
+def _render_marks(excerpt):
+    return html.escape(excerpt).replace(_MARK_START, '<mark>').replace(_MARK_END, '</mark>')
+
+
+def _search_sqlite(user_id, phrases, offset, limit):
+    expression = _fts5_expression(user_id, phrases)
+    total = db.session.execute(
+        text(f"SELECT count(*) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :q"),
+        {'q': expression}
+    ).scalar()
+    rows = db.session.execute(text(
+        f"SELECT r.id, r.filename, r.original_filename, r.upload_date, "
+        f"snippet({FTS_TABLE}, 1, :mark_start, :mark_end, '…', 24) AS snippet "
+        f"FROM {FTS_TABLE} JOIN blood_reports r ON r.id = {FTS_TABLE}.rowid "
+        f"WHERE {FTS_TABLE} MATCH :q ORDER BY {FTS_TABLE}.rank LIMIT :limit OFFSET :offset"
+    ).columns(upload_date=db.DateTime), {
+        'q': expression, 'limit': limit, 'offset': offset,
+        'mark_start': _MARK_START, 'mark_end': _MARK_END
+    }).all()
+    return total, [(row, _render_marks(row.snippet)) for row in rows]
+
+
+def _search_mysql(user_id, phrases, offset, limit):
+    match = "MATCH(extracted_text) AGAINST (:q IN BOOLEAN MODE)"
+    params = {'q': _mysql_expression(phrases), 'user_id': user_id}
+    total = db.session.execute(
+        text(f"SELECT count(*) FROM blood_reports WHERE user_id = :user_id AND {match}"),
+        params
+    ).scalar()
+    rows = db.session.execute(text(
+        f"SELECT id, filename, original_filename, upload_date, extracted_text, {match} AS score "
+        f"FROM blood_reports WHERE user_id = :user_id AND {match} "
+        f"ORDER BY score DESC, id DESC LIMIT :limit OFFSET :offset"
+    ).columns(upload_date=db.DateTime), {**params, 'limit': limit, 'offset': offset}).all()
+    return total, [(row, highlight(row.extracted_text, phrases)) for row in rows]
+
+
+def _search_scan(user_id, phrases, offset, limit):
+    """Unindexed fallback for other databases"""
+    query = BloodReport.query.filter(BloodReport.user_id == user_id)
+    for phrase in phrases:
+        query = query.filter(BloodReport.extracted_text.ilike(f"%{phrase}%"))
+    total = query.count()
+    rows = query.order_by(BloodReport.id.desc()).offset(offset).limit(limit).all()
+    return total, [(row, highlight(row.extracted_text, phrases)) for row in rows]
+
+
+def search_reports(user_id, query, page=1, per_page=20):
+    """Return (total, results) for one page of the user's matching reports"""
+    phrases = parse_query(query)
+    if not phrases:
+        return 0, []
+
+    search = {'sqlite': _search_sqlite, 'mysql': _search_mysql}.get(_dialect(), _search_scan)
+    total, rows = search(user_id, phrases, (page - 1) * per_page, per_page)
+
+    results = []
+    for row, snippet in rows:
+        results.append({
+            'id': row.id,
+            'filename': row.filename,
+            'original_filename': row.original_filename,
+            'upload_date': row.upload_date.isoformat(),
+            'snippet': snippet
+        })
+    return total, results
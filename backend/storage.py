@@ -0,0 +1,320 @@
+"""
+Upload storage with content-addressed keys and pluggable backends
+Each upload is stored once under the SHA-256 of its bytes, sharded two
+directory levels deep (ab/cd/abcd...ef.pdf), so uploads with the same name
+never collide and no directory grows past a few thousand entries. Images can
+be gzip-compressed at rest; their key then ends in .gz and reads decompress
+transparently
+"""
+
+import gzip
+import hashlib
+import io
+import os
+import re
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+COMPRESSED_SUFFIX = '.gz'
+IMAGE_EXTENSIONS = {'png', 'jpg', 'jpeg'}
+
+_key_pattern = re.compile(r'^([0-9a-f]{2})/([0-9a-f]{2})/\1\2[0-9a-f]{60}\.[a-z0-9]+(\.gz)?$')
+
+
+def storage_key(data, extension, compressed=False):
+    """Content-addressed key for an upload's original bytes"""
+    digest = hashlib.sha256(data).hexdigest()
+    key = f"{digest[:2]}/{digest[2:4]}/{digest}.{extension.lower()}"
+    return key + COMPRESSED_SUFFIX if compressed else key
+
+
+def is_storage_key(value):
+    return bool(value) and _key_pattern.match(value) is not None
+
+
+class StorageBackend(ABC):
+    """Where upload bytes live; keys are '/'-separated names from storage_key"""
+
+    @abstractmethod
+    def put(self, key, data):
+        """Store data under key; storing an existing key refreshes its modified time"""
+
+    @abstractmethod
+    def get(self, key):
+        """Stored bytes of key"""
+
+    @abstractmethod
+    def exists(self, key):
+        """Whether key is stored"""
+
+    @abstractmethod
+    def modified(self, key):
+        """Naive UTC modified time of key, or None if it is not stored"""
+
+    def touch(self, key):
+        """Refresh the modified time of key; False if it is not stored"""
+        if not self.exists(key):
+            return False
+        self.put(key, self.get(key))
+        return True
+
+    @abstractmethod
+    def delete(self, key):
+        """Remove key, ignoring keys that are already gone"""
+
+    @abstractmethod
+    def list(self, after='', limit=1000):
+        """Return up to limit (key, modified) pairs sorted by key, starting after the given key"""
+
+    def local_path(self, key):
+        """Filesystem path that can be read in place, or None"""
+        return None
+
+
+class LocalStorage(StorageBackend):
+    """Sharded directory tree on local disk"""
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key):
+        if not is_storage_key(key):
+            raise ValueError(f"Invalid storage key: {key!r}")
+        return os.path.join(self.root, *key.split('/'))
+
+    def put(self, key, data):
+        if self.touch(key):
+            return  # Same content already stored
+        path = self._path(key)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        # Write aside and rename so concurrent uploads of one file never see a partial object
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def get(self, key):
+        with open(self._path(key), 'rb') as f:
+            return f.read()
+
+    def exists(self, key):
+        return os.path.exists(self._path(key))
+
+    def modified(self, key):
+        try:
+            return datetime.utcfromtimestamp(os.stat(self._path(key)).st_mtime)
+        except FileNotFoundError:
+            return None
+
+    def touch(self, key):
+        try:
+            os.utime(self._path(key))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def _shards(self, path, after_shard):
+        """Sorted two-hex-digit subdirectories of path, skipping those before after_shard"""
+        try:
+            names = sorted(
+                entry.name for entry in os.scandir(path)
+                if entry.is_dir() and len(entry.name) == 2 and entry.name >= after_shard
+            )
+        except FileNotFoundError:
+            return []
+        return [name for name in names if all(c in '0123456789abcdef' for c in name)]
+
+    def list(self, after='', limit=1000):
+        results = []
+        # Legacy flat files in the root are not storage keys and are never listed
+        for first in self._shards(self.root, after[:2]):
+            for second in self._shards(os.path.join(self.root, first), after[3:5] if first == after[:2] else ''):
+                directory = os.path.join(self.root, first, second)
+                for entry in sorted(os.scandir(directory), key=lambda e: e.name):
+                    key = f"{first}/{second}/{entry.name}"
+                    if key <= after or not is_storage_key(key):
+                        continue
+                    modified = datetime.utcfromtimestamp(entry.stat().st_mtime)
+                    results.append((key, modified))
+                    if len(results) >= limit:
+                        return results
+        return results
+
+    def local_path(self, key):
+        return self._path(key)
+
+
+def _naive_utc(moment):
+    """boto3 returns aware datetimes; the rest of the app uses naive UTC"""
+    if moment.tzinfo is None:
+        return moment
+    return moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+class ObjectStorage(StorageBackend):
+    """Bucket on an S3-compatible object store, through a boto3-style client"""
+
+    def __init__(self, client, bucket):
+        self.client = client
+        self.bucket = bucket
+
+    def put(self, key, data):
+        # Object stores overwrite atomically, which also refreshes LastModified
+        self.client.put_object(Bucket=self.bucket, Key=key, Body=data)
+
+    def get(self, key):
+        return self.client.get_object(Bucket=self.bucket, Key=key)['Body'].read()
+
+    def exists(self, key):
+        response = self.client.list_objects_v2(Bucket=self.bucket, Prefix=key, MaxKeys=1)
+        return any(item['Key'] == key for item in response.get('Contents', []))
+
+    def modified(self, key):
+        response = self.client.list_objects_v2(Bucket=self.bucket, Prefix=key, MaxKeys=1)
+        for item in response.get('Contents', []):
+            if item['Key'] == key:
+                return _naive_utc(item['LastModified'])
+        return None
+
+    def touch(self, key):
+        if not self.exists(key):
+            return False
+        # Copying an object onto itself is how S3 refreshes LastModified without a download
+        self.client.copy_object(
+            Bucket=self.bucket, Key=key, CopySource={'Bucket': self.bucket, 'Key': key},
+            MetadataDirective='REPLACE'
+        )
+        return True
+
+    def delete(self, key):
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+    def list(self, after='', limit=1000):
+        response = self.client.list_objects_v2(Bucket=self.bucket, StartAfter=after, MaxKeys=limit)
+        return [(item['Key'], _naive_utc(item['LastModified'])) for item in response.get('Contents', [])]
+
+
+class MemoryObjectClient:
+    """In-process stand-in for the subset of the S3 client API used by ObjectStorage"""
+
+    def __init__(self):
+        self._objects = {}
+        self._lock = threading.Lock()
+
+    def put_object(self, Bucket, Key, Body):
+        with self._lock:
+            self._objects[(Bucket, Key)] = (bytes(Body), datetime.now(timezone.utc))
+        return {}
+
+    def get_object(self, Bucket, Key):
+        with self._lock:
+            if (Bucket, Key) not in self._objects:
+                raise KeyError(f"NoSuchKey: {Key}")
+            body, modified = self._objects[(Bucket, Key)]
+        return {'Body': io.BytesIO(body), 'ContentLength': len(body), 'LastModified': modified}
+
+    def copy_object(self, Bucket, Key, CopySource, MetadataDirective='COPY'):
+        with self._lock:
+            body, _ = self._objects[(CopySource['Bucket'], CopySource['Key'])]
+            self._objects[(Bucket, Key)] = (body, datetime.now(timezone.utc))
+        return {}
+
+    def delete_object(self, Bucket, Key):
+        with self._lock:
+            self._objects.pop((Bucket, Key), None)
+        return {}
+
+    def list_objects_v2(self, Bucket, Prefix='', StartAfter='', MaxKeys=1000):
+        with self._lock:
+            keys = sorted(
+                key for bucket, key in self._objects
+                if bucket == Bucket and key.startswith(Prefix) and key > StartAfter
+            )
+            contents = [
+                {'Key': key, 'LastModified': self._objects[(Bucket, key)][1],
+                 'Size': len(self._objects[(Bucket, key)][0])}
+                for key in keys[:MaxKeys]
+            ]
+        return {'Contents': contents, 'KeyCount': len(contents), 'IsTruncated': len(keys) > MaxKeys}
+
+
+class UploadStorage:
+    """Content addressing and optional image compression on top of a backend"""
+
+    def __init__(self, backend, compress_images=False, min_saving=0.05):
+        self.backend = backend
+        self.compress_images = compress_images
+        self.min_saving = min_saving
+
+    def save(self, data, filename):
+        """Store an upload and return its key; identical content is stored once"""
+        extension = filename.rsplit('.', 1)[-1].lower()
+        key = storage_key(data, extension)
+        if self.compress_images and extension in IMAGE_EXTENSIONS:
+            # Skip compressing when this content is already stored either way
+            for candidate in (key + COMPRESSED_SUFFIX, key):
+                if self.backend.touch(candidate):
+                    return candidate
+            packed = gzip.compress(data, compresslevel=6, mtime=0)
+            # JPEG and most PNGs are already compressed; only keep gzip when it pays off
+            if len(packed) <= len(data) * (1 - self.min_saving):
+                key += COMPRESSED_SUFFIX
+                data = packed
+        self.backend.put(key, data)
+        return key
+
+    def read(self, key):
+        """Original bytes of a stored upload"""
+        data = self.backend.get(key)
+        return gzip.decompress(data) if key.endswith(COMPRESSED_SUFFIX) else data
+
+    @contextmanager
+    def local_file(self, key):
+        """Path to the original upload for tools that need a file (pdfplumber, poppler, tesseract)"""
+        path = None if key.endswith(COMPRESSED_SUFFIX) else self.backend.local_path(key)
+        if path is not None:
+            yield path
+            return
+        original_key = key[:-len(COMPRESSED_SUFFIX)] if key.endswith(COMPRESSED_SUFFIX) else key
+        fd, temp_path = tempfile.mkstemp(suffix='.' + original_key.rsplit('.', 1)[-1])
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(self.read(key))
+            yield temp_path
+        finally:
+            os.remove(temp_path)
+
+    def delete(self, key):
+        self.backend.delete(key)
+
+
+def create_storage(config):
+    """Build the upload storage selected by STORAGE_BACKEND"""
+    backend_name = config['STORAGE_BACKEND']
+    if backend_name == 'local':
+        backend = LocalStorage(config['UPLOAD_FOLDER'])
+    elif backend_name == 'memory':
+        backend = ObjectStorage(MemoryObjectClient(), config['STORAGE_BUCKET'])
+    else:
+        raise ValueError(f"Unknown STORAGE_BACKEND '{backend_name}'")
+    return UploadStorage(
+        backend,
+        compress_images=config['STORAGE_COMPRESS_IMAGES'],
+        min_saving=config['STORAGE_COMPRESS_MIN_SAVING']
+    )
@@ -0,0 +1,51 @@
+import os
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.join(BACKEND_DIR, 'benchmarks'))
+
+# Settings are read when config is imported: SQLite in memory and the object-store stand-in
+os.environ['DATABASE_URL'] = 'sqlite://'
+os.environ['STORAGE_BACKEND'] = 'memory'
+
+from sqlalchemy import text  # noqa: E402
+
+import app as backend  # noqa: E402
+from analysis_cache import analysis_cache  # noqa: E402
+from models import db, User  # noqa: E402
+from search import FTS_TABLE, init_search_index  # noqa: E402
+from storage import create_storage  # noqa: E402
+
+
+@pytest.fixture
+def storage(monkeypatch):
+    storage = create_storage(backend.app.config)
+    monkeypatch.setattr(backend, 'storage', storage)
+    return storage
+
+
+@pytest.fixture
+def make_user():
+    def make(email='test@example.com', name='Test'):
+        user = User(name=name, email=email)
+        user.set_password('secret')
+        db.session.add(user)
+        db.session.commit()
+        return user
+    return make
+
+
+@pytest.fixture
+def client(storage, make_user):
+    """Test client on an empty database with one user (id 1)"""
+    analysis_cache.clear()
+    with backend.app.app_context():
+        db.drop_all()
+        db.session.execute(text(f"DROP TABLE IF EXISTS {FTS_TABLE}"))
+        db.create_all()
+        init_search_index()
+        make_user()
+        yield backend.app.test_client()
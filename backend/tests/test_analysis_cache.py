@@ -0,0 +1,92 @@
+import orjson
+
+import app as backend
+import synthetic_reports
+from analysis_cache import AnalysisCache, analysis_cache, cache_key, cached_analysis, normalize_text
+from models import db, BloodReport
+from reanalysis import reanalyze_reports
+
+
+def entry(size):
+    """An analysis whose orjson encoding is exactly size bytes"""
+    value = {'text': ''}
+    value['text'] = 'x' * (size - len(orjson.dumps(value)))
+    return value
+
+
+def test_put_evicts_least_recently_used_to_stay_under_cap():
+    cache = AnalysisCache(max_bytes=300)
+    for key in 'abc':
+        cache.put(key, entry(100))
+    assert cache.get('a') is not None  # a becomes most recently used
+
+    cache.put('d', entry(100))
+
+    assert cache.get('b') is None
+    assert {key for key in 'acd' if cache.get(key) is not None} == {'a', 'c', 'd'}
+    assert cache.current_bytes == 300
+
+
+def test_oversized_entries_are_not_cached():
+    cache = AnalysisCache(max_bytes=50)
+    cache.put('big', entry(100))
+    assert len(cache) == 0 and cache.current_bytes == 0
+
+
+def test_resize_evicts_to_the_new_cap():
+    cache = AnalysisCache(max_bytes=1000)
+    for key in 'abcd':
+        cache.put(key, entry(100))
+
+    cache.resize(200)
+
+    assert len(cache) == 2 and cache.current_bytes == 200
+    assert cache.get('a') is None and cache.get('d') is not None
+
+
+def test_cache_is_sized_from_app_config(monkeypatch):
+    monkeypatch.setitem(backend.app.config, 'ANALYSIS_CACHE_MAX_BYTES', 12345)
+    original = analysis_cache.max_bytes
+    try:
+        backend.init_analysis_cache(backend.app)
+        assert analysis_cache.max_bytes == 12345
+    finally:
+        analysis_cache.resize(original)
+
+
+def save(text, user_id=1):
+    key, analysis = cached_analysis(text)
+    return backend.save_report(user_id, 'r.pdf', 'r.pdf', None, text, analysis, key)
+
+
+def test_persistent_tier_serves_stored_analysis(client, monkeypatch):
+    text = synthetic_reports.generate_report_text(1, 3)
+    report = save(text)
+    analysis_cache.clear()
+
+    def analyze(text):
+        raise AssertionError("analysis should have come from the database")
+    monkeypatch.setattr('analysis_cache.analyze_blood_report', analyze)
+
+    key, analysis = cached_analysis(text, persistent=True)
+
+    assert key == report.analysis_key
+    assert analysis == report.analysis
+
+
+def test_reanalysis_skips_unchanged_reports(client):
+    unchanged = save(synthetic_reports.generate_report_text(1, 4))
+    stale = save(synthetic_reports.generate_report_text(1, 5))
+    stale.analysis_key = 'outdated'
+    stale_date = stale.analysis_date
+    unchanged_date = unchanged.analysis_date
+    db.session.commit()
+
+    stats = reanalyze_reports(chunk_size=1, workers=1)
+
+    assert stats == {'scanned': 2, 'skipped': 1, 'reanalyzed': 1}
+    db.session.expire_all()
+    assert db.session.get(BloodReport, unchanged.id).analysis_date == unchanged_date
+    refreshed = db.session.get(BloodReport, stale.id)
+    assert refreshed.analysis_key == cache_key(normalize_text(refreshed.extracted_text))
+    assert refreshed.analysis_date > stale_date
@@ -0,0 +1,111 @@
+import pytest
+from reportlab.pdfgen import canvas
+
+import app as backend
+from analysis import analyze_blood_report
+
+
+@pytest.fixture
+def upload(client, tmp_path):
+    """Upload a text PDF with the given lines for a user and return the response body"""
+    def upload(*lines, user_id=1):
+        path = tmp_path / f"report_{len(list(tmp_path.iterdir()))}.pdf"
+        pdf = canvas.Canvas(str(path))
+        text = pdf.beginText(40, 800)
+        for line in lines:
+            text.textLine(line)
+        pdf.drawText(text)
+        pdf.save()
+        response = client.post('/upload', data={'file': (open(path, 'rb'), 'report.pdf'), 'user_id': str(user_id)})
+        assert response.status_code == 200, response.get_json()
+        return response.get_json()
+    return upload
+
+
+def save(user_id, text):
+    return backend.save_report(user_id, 'r.pdf', 'r.pdf', None, text, analyze_blood_report(text), None)
+
+
+def compare(client, **payload):
+    return client.post('/reports/compare', json={'user_id': 1, **payload})
+
+
+def test_first_upload_lists_everything_as_new(upload):
+    comparison = upload('Hemoglobin: 10 g/dL', 'Glucose: 90 mg/dL')['comparison']
+
+    assert comparison['changes'] == [] and comparison['crossed'] == []
+    assert sorted(comparison['newParameters']) == ['Glucose', 'Hemoglobin']
+
+
+def test_upload_compares_with_the_previous_report(upload):
+    upload('Hemoglobin: 10 g/dL', 'Glucose: 90 mg/dL')
+    comparison = upload('Hemoglobin: 11 g/dL', 'Glucose: 130 mg/dL')['comparison']
+
+    assert comparison['crossed'] == ['Glucose']
+    assert sorted(comparison['significant']) == ['Glucose', 'Hemoglobin']
+    glucose = next(change for change in comparison['changes'] if change['name'] == 'Glucose')
+    assert (glucose['previousStatus'], glucose['status']) == ('normal', 'high')
+
+
+def test_parameters_missing_from_the_new_upload_are_not_crossed(upload):
+    upload('Hemoglobin: 10 g/dL', 'Glucose: 90 mg/dL')
+    upload('Hemoglobin: 11 g/dL', 'Glucose: 130 mg/dL')
+    comparison = upload('Cholesterol: 180 mg/dL')['comparison']
+
+    assert comparison['changes'] == []
+    assert comparison['crossed'] == [] and comparison['significant'] == []
+    assert comparison['newParameters'] == ['Cholesterol']
+
+
+def test_latest_compares_each_parameter_with_its_previous_value(client):
+    save(1, 'Hemoglobin: 10 Glucose: 90')
+    save(1, 'Hemoglobin: 11 Glucose: 130')
+    save(1, 'Cholesterol: 180')
+
+    comparison = compare(client).get_json()['comparison']
+
+    assert {change['name']: change['previous'] for change in comparison['changes']} == {
+        'Hemoglobin': 10.0, 'Glucose': 90.0
+    }
+    assert comparison['crossed'] == ['Glucose']
+    assert comparison['newParameters'] == ['Cholesterol']
+
+
+def test_explicit_report_pair(client):
+    first = save(1, 'Hemoglobin: 10 Glucose: 90')
+    save(1, 'Hemoglobin: 11 Glucose: 130')
+    third = save(1, 'Hemoglobin: 13 Glucose: 95')
+
+    response = compare(client, report_id=third.id, baseline_report_id=first.id, threshold=25)
+
+    assert response.status_code == 200
+    comparison = response.get_json()['comparison']
+    assert comparison['threshold'] == 25
+    assert comparison['crossed'] == ['Hemoglobin']
+    assert comparison['significant'] == ['Hemoglobin']
+    assert {change['previousReportId'] for change in comparison['changes']} == {first.id}
+
+
+@pytest.mark.parametrize('payload', [
+    {'user_id': None},
+    {'user_id': 'one'},
+    {'report_id': ['1']},
+    {'report_id': 1},
+    {'baseline_report_id': 1},
+    {'threshold': 'ten'},
+    {'threshold': 'nan'},
+    {'threshold': 'inf'},
+    {'threshold': -5},
+])
+def test_invalid_requests_are_rejected(client, payload):
+    save(1, 'Hemoglobin: 10')
+    assert compare(client, **payload).status_code == 400
+
+
+def test_reports_of_another_user_are_not_found(client, make_user):
+    other = make_user(email='other@example.com')
+    mine = save(1, 'Hemoglobin: 10')
+    theirs = save(other.id, 'Hemoglobin: 12')
+
+    assert compare(client, report_id=mine.id, baseline_report_id=theirs.id).status_code == 404
+    assert compare(client, report_id=mine.id, baseline_report_id=mine.id + 100).status_code == 404
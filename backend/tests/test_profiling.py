@@ -0,0 +1,71 @@
+import time
+
+import pytest
+from prometheus_client import REGISTRY
+
+import app as backend
+import synthetic_reports
+
+DELAY = 0.2
+
+
+@pytest.fixture
+def report(tmp_path):
+    return synthetic_reports.write_report_pdf(str(tmp_path / 'report.pdf'))
+
+
+@pytest.fixture
+def slow_analysis(monkeypatch):
+    """Make the last step of an upload take at least DELAY seconds"""
+    build_upload_result = backend.build_upload_result
+
+    def slow(upload, extracted_text):
+        time.sleep(DELAY)
+        return build_upload_result(upload, extracted_text)
+    monkeypatch.setattr(backend, 'build_upload_result', slow)
+
+
+def request_seconds(endpoint, statistic):
+    labels = {'endpoint': endpoint, 'method': 'POST', 'status': '200'}
+    return REGISTRY.get_sample_value(f'bloodsight_request_seconds_{statistic}', labels) or 0.0
+
+
+def post(client, path, report):
+    return client.post(path, data={'file': (open(report, 'rb'), 'report.pdf'), 'user_id': '1'},
+                       headers={'X-Timing': '1'}, buffered=True)
+
+
+@pytest.mark.parametrize('endpoint, path', [
+    ('upload_file', '/upload'),
+    ('upload_file_stream', '/upload/stream'),
+])
+def test_request_latency_covers_the_whole_response(client, report, slow_analysis, endpoint, path):
+    count = request_seconds(endpoint, 'count')
+    total = request_seconds(endpoint, 'sum')
+
+    response = post(client, path, report)
+
+    assert response.status_code == 200
+    assert request_seconds(endpoint, 'count') == count + 1
+    assert request_seconds(endpoint, 'sum') - total >= DELAY
+    assert 'total;dur=' in response.headers['Server-Timing']
+
+
+def test_streamed_headers_only_cover_work_before_the_body(client, report, slow_analysis):
+    response = post(client, '/upload/stream', report)
+
+    assert b'event: result' in response.data
+    assert response.headers['Server-Timing'].startswith('save;dur=')
+    assert 'analyze' not in response.headers['Server-Timing']
+
+
+def test_streamed_profile_is_written_after_the_stream(client, report, slow_analysis, monkeypatch, tmp_path):
+    profile_dir = tmp_path / 'profiles'
+    monkeypatch.setitem(backend.app.config, 'PROFILE_DIR', str(profile_dir))
+    monkeypatch.setitem(backend.app.config, 'PROFILE_EVERY_N', 1)
+
+    post(client, '/upload/stream', report)
+
+    [dump] = profile_dir.iterdir()
+    assert '_upload_file_stream_' in dump.name
+    assert int(dump.name.rsplit('_', 1)[1].removesuffix('ms.prof')) >= DELAY * 1000
@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+import synthetic_reports
+from analysis import analyze_blood_report
+from rule_engine import RuleError, load_rules, rule_set
+from value_codec import pack_values, unpack_values
+
+
+@pytest.fixture(scope='module')
+def analyses():
+    return [analyze_blood_report(synthetic_reports.generate_report_text(1, seed)) for seed in range(300)]
+
+
+def write_rules(tmp_path, body):
+    path = tmp_path / 'rules.yaml'
+    path.write_text(body)
+    return str(path)
+
+
+def test_pack_round_trip(analyses):
+    for analysis in analyses:
+        blood_values = analysis['bloodValues']
+        assert unpack_values(pack_values(blood_values)) == blood_values
+
+
+def test_empty_pack_round_trip():
+    assert unpack_values(pack_values([])) == []
+    assert unpack_values(None) == []
+
+
+def test_batch_scoring_matches_single_report(analyses):
+    fired = rule_set.score_packed([pack_values(a['bloodValues']) for a in analyses])
+    assert fired.shape == (len(analyses), len(rule_set.rules))
+    for row, analysis in zip(fired, analyses):
+        single = [rule['id'] for rule in rule_set.score(analysis['bloodValues'])]
+        batch = [rule['id'] for rule, hit in zip(rule_set.rules, row) if hit]
+        assert batch == single
+    assert fired.any()
+
+
+def test_missing_blobs_fire_nothing():
+    fired = rule_set.score_packed([None, b''])
+    assert not np.any(fired)
+
+
+def test_unknown_parameter(tmp_path):
+    path = write_rules(tmp_path, """
+rules:
+  - id: bad
+    name: Bad
+    when: {parameter: unobtainium, status: high}
+""")
+    with pytest.raises(RuleError, match="unknown parameter"):
+        load_rules(path)
+
+
+def test_empty_all(tmp_path):
+    path = write_rules(tmp_path, """
+rules:
+  - id: bad
+    name: Bad
+    when: {all: []}
+""")
+    with pytest.raises(RuleError, match="empty all/any"):
+        load_rules(path)
+
+
+def test_all_and_any_together(tmp_path):
+    path = write_rules(tmp_path, """
+rules:
+  - id: bad
+    name: Bad
+    when:
+      all: [{parameter: glucose, status: high}]
+      any: [{parameter: hemoglobin, status: low}]
+""")
+    with pytest.raises(RuleError, match="mixes all and any"):
+        load_rules(path)
+
+
+def test_duplicate_ids(tmp_path):
+    path = write_rules(tmp_path, """
+rules:
+  - {id: same, name: One, when: {parameter: glucose, gt: 100}}
+  - {id: same, name: Two, when: {parameter: glucose, lt: 70}}
+""")
+    with pytest.raises(RuleError, match="unique id"):
+        load_rules(path)
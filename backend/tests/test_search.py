@@ -0,0 +1,58 @@
+import app as backend
+from search import highlight, parse_query
+
+SHARED_TEXT = "Peripheral smear: occasional blast cells seen. Hemoglobin 9.8 g/dL"
+
+
+def save(user_id, text, filename='r.pdf'):
+    return backend.save_report(user_id, filename, filename, None, text, {'bloodValues': []}, None)
+
+
+def search(client, user_id, q):
+    response = client.get('/reports/search', query_string={'user_id': user_id, 'q': q})
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+
+def test_results_are_scoped_to_the_user(client, make_user):
+    other = make_user(email='other@example.com')
+    mine = save(1, SHARED_TEXT, 'mine.pdf')
+    theirs = save(other.id, SHARED_TEXT, 'theirs.pdf')
+
+    assert [r['id'] for r in search(client, 1, 'hemoglobin')['results']] == [mine.id]
+    assert [r['id'] for r in search(client, other.id, 'hemoglobin')['results']] == [theirs.id]
+
+
+def test_owner_token_is_not_a_prefix_match(client, make_user):
+    users = [make_user(email=f"user{i}@example.com") for i in range(2, 12)]
+    assert users[-1].id == 11
+    save(11, SHARED_TEXT)
+
+    assert search(client, 1, 'hemoglobin')['total'] == 0
+    assert search(client, 11, 'hemoglobin')['total'] == 1
+
+
+def test_quoted_phrase_matches_adjacent_words_only(client):
+    adjacent = save(1, SHARED_TEXT)
+    save(1, "Cells counted manually; no blast forms present")
+
+    result = search(client, 1, '"blast cells"')
+
+    assert result['total'] == 1
+    assert result['results'][0]['id'] == adjacent.id
+    assert '<mark>blast cells</mark>' in result['results'][0]['snippet']
+    assert search(client, 1, 'blast cells')['total'] == 2
+
+
+def test_search_requires_query_and_user(client):
+    assert client.get('/reports/search', query_string={'user_id': 1}).status_code == 400
+    assert client.get('/reports/search', query_string={'q': 'blast'}).status_code == 400
+
+
+def test_parse_query_keeps_quoted_phrases():
+    assert parse_query('"blast  cells" hemoglobin') == ['blast cells', 'hemoglobin']
+
+
+def test_highlight_marks_matches_and_escapes_html():
+    snippet = highlight("<b>Blast cells</b> present; blast count 4%", ['blast cells'])
+    assert snippet == '&lt;b&gt;<mark>Blast cells</mark>&lt;/b&gt; present; blast count 4%'
@@ -0,0 +1,115 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import synthetic_reports
+from models import db, BloodReport
+from retention import cleanup_uploads, sweep_orphans
+from storage import MemoryObjectClient, ObjectStorage, StorageBackend, UploadStorage
+
+
+@pytest.fixture
+def reports(tmp_path):
+    paths = []
+    for seed in range(2):
+        path = tmp_path / f"report_{seed}.pdf"
+        synthetic_reports.write_report_pdf(str(path), pages=1, seed=seed)
+        paths.append(path)
+    return paths
+
+
+def upload(client, path, filename='BloodReport.pdf', user_id=1):
+    data = {'file': (open(path, 'rb'), filename)}
+    if user_id:
+        data['user_id'] = str(user_id)
+    response = client.post('/upload', data=data)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+
+def test_same_name_uploads_do_not_collide(client, storage, reports):
+    first = upload(client, reports[0])
+    second = upload(client, reports[1])
+
+    keys = [db.session.get(BloodReport, result['report_id']).file_path for result in (first, second)]
+    assert keys[0] != keys[1]
+    for key, path in zip(keys, reports):
+        assert storage.read(key) == path.read_bytes()
+
+
+def test_identical_content_is_stored_once_and_refreshed(storage):
+    key = storage.save(b'%PDF-1.4 same bytes', 'a.pdf')
+    first_modified = storage.backend.modified(key)
+
+    assert storage.save(b'%PDF-1.4 same bytes', 'b.pdf') == key
+    assert [listed for listed, _ in storage.backend.list()] == [key]
+    assert storage.backend.modified(key) > first_modified
+
+
+def test_compressed_image_round_trip(tmp_path):
+    storage = UploadStorage(ObjectStorage(MemoryObjectClient(), 'test'), compress_images=True)
+    image_path = tmp_path / 'scan.png'
+    synthetic_reports.write_report_image(str(image_path))
+    original = image_path.read_bytes()
+
+    key = storage.save(original, 'scan.png')
+    assert key.endswith('.png.gz')
+    assert len(storage.backend.get(key)) < len(original)
+    with storage.local_file(key) as path:
+        assert path.endswith('.png')
+        with open(path, 'rb') as f:
+            assert f.read() == original
+
+
+def test_retention_expires_only_old_reports(client, storage, reports):
+    old = upload(client, reports[0])
+    new = upload(client, reports[1])
+    old_report = db.session.get(BloodReport, old['report_id'])
+    old_key = old_report.file_path
+    old_report.upload_date = datetime.utcnow() - timedelta(days=40)
+    db.session.commit()
+
+    stats = cleanup_uploads(storage, retention_days=30, grace_hours=0)
+
+    assert stats == {'expired': 1, 'scanned': 2, 'deleted': 1}
+    assert db.session.get(BloodReport, old['report_id']).file_path is None
+    assert db.session.get(BloodReport, old['report_id']).extracted_text
+    new_key = db.session.get(BloodReport, new['report_id']).file_path
+    assert storage.backend.exists(new_key)
+    assert not storage.backend.exists(old_key)
+
+
+def test_sweep_keeps_referenced_keys(client, storage, reports):
+    old = upload(client, reports[0])
+    upload(client, reports[0])  # Same content again, still within retention
+    upload(client, reports[1], user_id=None)  # Anonymous, never referenced
+    report = db.session.get(BloodReport, old['report_id'])
+    shared_key = report.file_path
+    report.upload_date = datetime.utcnow() - timedelta(days=40)
+    db.session.commit()
+
+    stats = cleanup_uploads(storage, retention_days=30, grace_hours=0)
+
+    assert stats == {'expired': 1, 'scanned': 2, 'deleted': 1}
+    assert db.session.get(BloodReport, old['report_id']).file_path is None
+    assert [key for key, _ in storage.backend.list()] == [shared_key]
+
+
+def test_sweep_keeps_keys_touched_after_listing(client, storage, monkeypatch):
+    key = storage.save(b'%PDF-1.4 orphan', 'orphan.pdf')
+    stale = datetime.utcnow() - timedelta(days=2)
+    monkeypatch.setattr(storage.backend, 'list', lambda after='', limit=1000: [(key, stale)] if not after else [])
+
+    scanned, deleted = sweep_orphans(storage, grace_hours=1)
+
+    assert (scanned, deleted) == (1, 0)
+    assert storage.backend.exists(key)
+
+
+def test_incomplete_backend_fails_on_creation():
+    class WriteOnly(StorageBackend):
+        def put(self, key, data):
+            pass
+
+    with pytest.raises(TypeError):
+        WriteOnly()
@@ -0,0 +1,104 @@
+"""
+Compact storage encoding for analysis results
+Blood values are dictionary-encoded (parameter, unit, normal range and status
+as small integers, the value as a float64) and packed into one binary blob per
+report; the rest of the analysis is stored as orjson
+"""
+
+import struct
+
+import orjson
+
+# Code tables are append-only: stored rows refer to entries by position
+PARAMETERS = (
+    'Hemoglobin', 'Wbc', 'Rbc', 'Platelet', 'Hematocrit', 'Mcv', 'Mch', 'Mchc',
+    'Glucose', 'Cholesterol', 'Hdl', 'Ldl', 'Triglycerides', 'Creatinine', 'Urea',
+    'Bilirubin', 'Alt', 'Ast', 'Albumin', 'Protein',
+)
+
+UNITS = (
+    'units', 'g/dL', '×10³/μL', '×10⁶/μL', '%', 'fL', 'pg', 'mg/dL', 'U/L',
+)
+
+NORMAL_RANGES = (
+    'N/A', '12.0-15.5', '4.5-11.0', '4.2-5.9', '150-450', '36-46', '80-100', '27-32',
+    '32-36', '70-100', '<200', '>40', '<100', '<150', '0.6-1.2', '7-20', '0.2-1.2',
+    '7-40', '8-40', '3.5-5.0', '6.0-8.3',
+)
+
+STATUSES = ('normal', 'high', 'low')
+
+PARAMETER_CODES = {name: code for code, name in enumerate(PARAMETERS)}
+UNIT_CODES = {unit: code for code, unit in enumerate(UNITS)}
+RANGE_CODES = {normal_range: code for code, normal_range in enumerate(NORMAL_RANGES)}
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+
+# Format version byte, then one record per value:
+# parameter, unit, normal range, status (uint8 each) and the value (float64)
+PACK_VERSION = 1
+_header = struct.Struct('<B')
+_record = struct.Struct('<BBBBd')
+
+
+def _code(table, key, kind):
+    try:
+        return table[key]
+    except KeyError:
+        raise ValueError(f"Unknown {kind} '{key}': add it to the end of the code table") from None
+
+
+def encode_value(blood_value):
+    """Return the (parameter, unit, range, status, value) codes for one API value"""
+    return (
+        _code(PARAMETER_CODES, blood_value['name'], 'parameter'),
+        _code(UNIT_CODES, blood_value['unit'], 'unit'),
+        _code(RANGE_CODES, blood_value['normalRange'], 'normal range'),
+        _code(STATUS_CODES, blood_value['status'], 'status'),
+        float(blood_value['value'])
+    )
+
+
+def pack_values(blood_values):
+    """Pack API blood values into a single binary blob"""
+    buffer = bytearray(_header.size + _record.size * len(blood_values))
+    _header.pack_into(buffer, 0, PACK_VERSION)
+    offset = _header.size
+    for blood_value in blood_values:
+        _record.pack_into(buffer, offset, *encode_value(blood_value))
+        offset += _record.size
+    return bytes(buffer)
+
+
+def unpack_values(packed):
+    """Unpack a blob back into API blood values"""
+    if not packed:
+        return []
+    version, = _header.unpack_from(packed)
+    if version != PACK_VERSION:
+        raise ValueError(f"Unsupported packed values version {version}")
+    return [
+        {
+            'name': PARAMETERS[parameter],
+            'value': str(value),
+            'unit': UNITS[unit],
+            'normalRange': NORMAL_RANGES[normal_range],
+            'status': STATUSES[status]
+        }
+        for parameter, unit, normal_range, status, value
+        in _record.iter_unpack(memoryview(packed)[_header.size:])
+    ]
+
+
+def encode_analysis(analysis):
+    """Split an analysis into (orjson summary, packed blood values)"""
+    summary = {key: value for key, value in analysis.items() if key != 'bloodValues'}
+    return orjson.dumps(summary), pack_values(analysis.get('bloodValues', []))
+
+
+def decode_analysis(summary, packed):
+    """Rebuild the analysis dict stored by encode_analysis"""
+    if summary is None:
+        return None
+    analysis = orjson.loads(summary)
+    analysis['bloodValues'] = unpack_values(packed)
+    return analysis
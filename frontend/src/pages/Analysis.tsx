@@ -29,6 +29,56 @@ import {
   Info,
 } from "lucide-react";
 
+interface UploadProgress {
+  stage: string;
+  page?: number;
+  pages?: number;
+}
+
+interface PartialBloodValue {
+  name: string;
+  value: string;
+  unit: string;
+  normalRange: string;
+  status: string;
+}
+
+const STAGE_LABELS: Record<string, string> = {
+  saved: "File received",
+  extract_pdf: "Reading PDF text",
+  ocr: "Running OCR on scanned pages",
+  analyze: "Analyzing results",
+};
+
+// Read Server-Sent Events from a streamed POST response (EventSource only supports GET)
+const readEvents = async (
+  response: Response,
+  onEvent: (event: string, data: any) => void
+) => {
+  const reader = response.body!.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let boundary: number;
+    while ((boundary = buffer.indexOf("\n\n")) !== -1) {
+      const block = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      let event = "message";
+      let data = "";
+      for (const line of block.split("\n")) {
+        if (line.startsWith("event: ")) event = line.slice(7);
+        else if (line.startsWith("data: ")) data += line.slice(6);
+      }
+      if (data) onEvent(event, JSON.parse(data));
+    }
+  }
+};
+
 const Analysis = () => {
   const navigate = useNavigate();
   const { user } = useAuth();
@@ -45,6 +95,8 @@ const Analysis = () => {
   });
   const [selectedFile, setSelectedFile] = useState<File | null>(null);
   const [isUploading, setIsUploading] = useState(false);
+  const [progress, setProgress] = useState<UploadProgress | null>(null);
+  const [partialValues, setPartialValues] = useState<PartialBloodValue[]>([]);
 
   const handleInputChange = (field: string, value: string) => {
     setFormData(prev => ({ ...prev, [field]: value }));
@@ -64,19 +116,40 @@ const Analysis = () => {
     }
 
     setIsUploading(true);
+    setProgress({ stage: "saved" });
+    setPartialValues([]);
     
     try {
       const formDataToSend = new FormData();
       formDataToSend.append('file', selectedFile);
+      if (user) {
+        formDataToSend.append('user_id', user.id);
+      }
 
-      const response = await fetch('http://localhost:5001/upload', {
+      const response = await fetch('http://localhost:5001/upload/stream', {
         method: 'POST',
         body: formDataToSend,
       });
 
-      const result = await response.json();
+      // Validation errors come back as plain JSON before any streaming starts
+      if (!response.ok || !response.headers.get('Content-Type')?.includes('text/event-stream')) {
+        const result = await response.json();
+        alert(`Error: ${result.error}`);
+        return;
+      }
+
+      let result: any = null;
+      await readEvents(response, (event, data) => {
+        if (event === 'stage' || event === 'page') {
+          setProgress({ stage: data.stage, page: data.page, pages: data.pages });
+        } else if (event === 'values') {
+          setPartialValues(prev => [...prev, ...data.bloodValues]);
+        } else if (event === 'result' || event === 'error') {
+          result = data;
+        }
+      });
 
-      if (result.success) {
+      if (result?.success) {
         // Navigate to results page with API response data
         const analysisData = {
           fileName: result.filename,
@@ -89,13 +162,14 @@ const Analysis = () => {
           state: { analysisData } 
         });
       } else {
-        alert(`Error: ${result.error}`);
+        alert(`Error: ${result?.error ?? 'Processing did not finish'}`);
       }
     } catch (error) {
       console.error('Upload error:', error);
       alert('Failed to upload file. Please try again.');
     } finally {
       setIsUploading(false);
+      setProgress(null);
     }
   };
 
@@ -286,6 +360,39 @@ const Analysis = () => {
                       </div>
                     )}
                   </div>
+
+                  {progress && (
+                    <div className="p-4 bg-white border rounded-lg space-y-3">
+                      <div className="flex items-center space-x-2 text-blue-700">
+                        <Activity className="h-5 w-5 animate-pulse" />
+                        <span className="font-medium">
+                          {STAGE_LABELS[progress.stage] ?? progress.stage}
+                          {progress.page && progress.pages && ` (page ${progress.page} of ${progress.pages})`}
+                        </span>
+                      </div>
+                      {progress.page && progress.pages && (
+                        <div className="w-full h-2 bg-gray-200 rounded-full">
+                          <div
+                            className="h-2 bg-blue-600 rounded-full transition-all"
+                            style={{ width: `${(progress.page / progress.pages) * 100}%` }}
+                          />
+                        </div>
+                      )}
+                      {partialValues.length > 0 && (
+                        <div className="flex flex-wrap gap-2">
+                          {partialValues.map((value) => (
+                            <Badge
+                              key={value.name}
+                              variant="secondary"
+                              className={value.status === "normal" ? "bg-green-100 text-green-800" : "bg-yellow-100 text-yellow-800"}
+                            >
+                              {value.name}: {value.value} {value.unit}
+                            </Badge>
+                          ))}
+                        </div>
+                      )}
+                    </div>
+                  )}
                   
                   <div className="bg-blue-50 p-4 rounded-lg">
                     <div className="flex items-start space-x-3">
@@ -325,10 +432,10 @@ const Analysis = () => {
             ) : (
               <Button
                 onClick={handleSubmit}
-                disabled={!selectedFile}
+                disabled={!selectedFile || isUploading}
                 className="bg-blue-600 hover:bg-blue-700"
               >
-                Submit for Analysis
+                {isUploading ? "Analyzing..." : "Submit for Analysis"}
               </Button>
             )}
           </div>